@@ -4,6 +4,13 @@ Implements intelligent decision-making using logical inference and probabilistic
 """
 
 import random
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+
+from geometry import BoardGeometry
+from linear_inference import LinearSystem
+from probability import frontier_probabilities
 
 
 class Sentence:
@@ -13,26 +20,71 @@ class Sentence:
     which are mines.
     
     For example: {(0,0), (0,1), (1,0)} = 2 means 2 of these 3 cells contain mines.
+    
+    Sentences are immutable and hashable, so they can be stored in sets and
+    used as dictionary keys. Marking a cell returns a new sentence.
     """
 
+    __slots__ = ('cells', 'count', '_hash')
+
     def __init__(self, cells, count):
         """
         Initialize a sentence with cells and mine count.
         
         Args:
-            cells: Set of tuples (i, j) representing cells
+            cells: Iterable of tuples (i, j) representing cells
             count: Number of mines among these cells
         """
-        self.cells = set(cells)
-        self.count = count
+        cells = frozenset(cells)
+        object.__setattr__(self, 'cells', cells)
+        object.__setattr__(self, 'count', count)
+        object.__setattr__(self, '_hash', hash((cells, count)))
+
+    def __setattr__(self, name, value):
+        """Sentences cannot be modified once created."""
+        raise AttributeError("Sentence objects are immutable")
+
+    def __reduce__(self):
+        """Rebuild through the constructor, so copy and pickle work."""
+        return (Sentence, (self.cells, self.count))
 
     def __eq__(self, other):
         """Check if two sentences are equal."""
-        return self.cells == other.cells and self.count == other.count
+        if not isinstance(other, Sentence):
+            return NotImplemented
+        return (self._hash == other._hash and self.count == other.count
+                and self.cells == other.cells)
+
+    def __hash__(self):
+        """Hash of the cells and count, computed once."""
+        return self._hash
+
+    def __len__(self):
+        """Number of cells in the sentence."""
+        return len(self.cells)
 
     def __str__(self):
         """String representation of the sentence."""
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.cells)} = {self.count}"
+
+    def is_proper_subset(self, other):
+        """
+        Check whether this sentence's cells are a proper subset of another's.
+        
+        Args:
+            other: Sentence to compare against
+        """
+        return self.cells < other.cells
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not
+        in other, assuming other's cells are a subset of this sentence's.
+        
+        Args:
+            other: Sentence contained in this one
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
 
     def known_mines(self):
         """
@@ -41,7 +93,7 @@ class Sentence:
         If the count equals the number of cells, all cells must be mines.
         """
         if len(self.cells) == self.count and self.count > 0:
-            return self.cells.copy()
+            return set(self.cells)
         return set()
 
     def known_safes(self):
@@ -51,47 +103,294 @@ class Sentence:
         If the count is 0, all cells must be safe.
         """
         if self.count == 0:
-            return self.cells.copy()
+            return set(self.cells)
         return set()
 
     def mark_mine(self, cell):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        Returns the sentence updated with the fact that a cell is known
+        to be a mine.
         
-        If the cell is in the sentence, remove it and decrement count.
+        If the cell is in the sentence, it is removed and the count decremented;
+        otherwise the sentence itself is returned.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
+            return Sentence(self.cells - {cell}, self.count - 1)
+        return self
 
     def mark_safe(self, cell):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        Returns the sentence updated with the fact that a cell is known
+        to be safe.
         
-        If the cell is in the sentence, simply remove it.
+        If the cell is in the sentence, it is simply removed; otherwise the
+        sentence itself is returned.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            return Sentence(self.cells - {cell}, self.count)
+        return self
+
+
+
+class FlatCodec:
+    """
+    Codec for compact mode, where cells already are flat indices.
+    
+    In tuple mode the board's BoardGeometry converts cells instead.
+    """
+
+    __slots__ = ()
+
+    def index(self, cell):
+        """Flat index of a cell."""
+        return cell
+
+    def cell(self, index):
+        """Cell at a flat index."""
+        return index
+
+
+class MaskSentence:
+    """
+    Sentence whose cells are stored as an integer bitmask.
+    
+    Cell (i, j) is bit i * width + j of the board. The mask is stored shifted
+    down to the sentence's lowest cell (kept in offset), so a sentence about
+    neighbouring cells stays a small integer however large the board is.
+    Subset tests and differences are single AND-NOT operations.
+    
+    Behaves like Sentence: immutable, hashable, and marking a cell returns a
+    new sentence.
+    """
+
+    __slots__ = ('mask', 'offset', 'count', 'codec', '_hash')
+
+    def __init__(self, mask, count, codec, offset=0):
+        """
+        Initialize a sentence from a bitmask and mine count.
+        
+        Args:
+            mask: Bitmask of cells, relative to offset
+            count: Number of mines among these cells
+            codec: BoardGeometry or FlatCodec mapping cells to bit positions
+            offset: Board index of bit 0 of the mask
+        """
+        if mask:
+            low = (mask & -mask).bit_length() - 1
+            mask >>= low
+            offset += low
+        else:
+            offset = 0
+        object.__setattr__(self, 'mask', mask)
+        object.__setattr__(self, 'offset', offset)
+        object.__setattr__(self, 'count', count)
+        object.__setattr__(self, 'codec', codec)
+        object.__setattr__(self, '_hash', hash((mask, offset, count)))
+
+    @classmethod
+    def from_cells(cls, cells, count, codec):
+        """
+        Build a sentence from an iterable of cells.
+        
+        Args:
+            cells: Iterable of tuples (i, j) representing cells
+            count: Number of mines among these cells
+            codec: BoardGeometry or FlatCodec mapping cells to bit positions
+        """
+        indices = [codec.index(cell) for cell in cells]
+        if not indices:
+            return cls(0, count, codec)
+        offset = min(indices)
+        mask = 0
+        for index in indices:
+            mask |= 1 << (index - offset)
+        return cls(mask, count, codec, offset)
+
+    def __setattr__(self, name, value):
+        """Sentences cannot be modified once created."""
+        raise AttributeError("Sentence objects are immutable")
+
+    def __reduce__(self):
+        """Rebuild through the constructor, so copy and pickle work."""
+        return (MaskSentence, (self.mask, self.count, self.codec, self.offset))
+
+    def __eq__(self, other):
+        """Check if two sentences are equal."""
+        if not isinstance(other, MaskSentence):
+            return NotImplemented
+        return (self.mask == other.mask and self.offset == other.offset
+                and self.count == other.count)
+
+    def __hash__(self):
+        """Hash of the mask and count, computed once."""
+        return self._hash
+
+    def __len__(self):
+        """Number of cells in the sentence."""
+        return bin(self.mask).count("1")
+
+    def __str__(self):
+        """String representation of the sentence."""
+        return f"{set(self.cells)} = {self.count}"
+
+    @property
+    def cells(self):
+        """Frozenset of the cells in the sentence, decoded from the mask."""
+        cells = []
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            cells.append(self.codec.cell(self.offset + low.bit_length() - 1))
+            mask ^= low
+        return frozenset(cells)
+
+    def _aligned(self, other):
+        """Other's mask shifted into this sentence's bit positions."""
+        shift = other.offset - self.offset
+        return other.mask << shift if shift >= 0 else other.mask >> -shift
+
+    def is_proper_subset(self, other):
+        """
+        Check whether this sentence's cells are a proper subset of another's.
+        
+        Args:
+            other: Sentence to compare against
+        """
+        if self.offset < other.offset:
+            return False
+        mask = self.mask << (self.offset - other.offset)
+        return mask != other.mask and mask & ~other.mask == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not
+        in other, assuming other's cells are a subset of this sentence's.
+        
+        Args:
+            other: Sentence contained in this one
+        """
+        return MaskSentence(self.mask & ~self._aligned(other),
+                            self.count - other.count, self.codec, self.offset)
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in the sentence known to be mines.
+        
+        If the count equals the number of cells, all cells must be mines.
+        """
+        if self.count > 0 and len(self) == self.count:
+            return set(self.cells)
+        return set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in the sentence known to be safe.
+        
+        If the count is 0, all cells must be safe.
+        """
+        if self.count == 0:
+            return set(self.cells)
+        return set()
+
+    def _bit(self, cell):
+        """Bit for a cell relative to the offset, or 0 if not in the sentence."""
+        shift = self.codec.index(cell) - self.offset
+        if shift < 0:
+            return 0
+        return self.mask & (1 << shift)
+
+    def mark_mine(self, cell):
+        """
+        Returns the sentence updated with the fact that a cell is known
+        to be a mine.
+        """
+        bit = self._bit(cell)
+        if bit:
+            return MaskSentence(self.mask ^ bit, self.count - 1, self.codec, self.offset)
+        return self
+
+    def mark_safe(self, cell):
+        """
+        Returns the sentence updated with the fact that a cell is known
+        to be safe.
+        """
+        bit = self._bit(cell)
+        if bit:
+            return MaskSentence(self.mask ^ bit, self.count, self.codec, self.offset)
+        return self
 
 
 class MinesweeperAI:
     """
     Minesweeper game player using logical inference and probabilistic reasoning.
+    
+    In compact mode cells are flat integer indices i * width + j, matching a
+    Minesweeper game created with compact=True.
     """
 
-    def __init__(self, height=8, width=8):
+    __slots__ = ('height', 'width', 'total_mines', 'backend', 'compact', 'rng', 'geometry',
+                 'codec', 'moves_made', 'mines', 'safes', 'knowledge', 'cell_index',
+                 '_neighbors', '_pending', '_queued', '_unknown_cells', '_unknown_positions',
+                 '_safe_moves', 'profiler', 'lookahead', 'inference', 'linear',
+                 '_linear_stale', 'compaction', 'max_sentences', '_derived', '_derivations',
+                 '_implied', 'compacted', 'evicted', '_trail', '_snapshots')
+
+    # Sentence representations that can be selected with the backend argument
+    BACKENDS = ('set', 'bitmask')
+
+    # Inference engines that can be selected with the inference argument
+    INFERENCE_ENGINES = ('subset', 'linear')
+
+    def __init__(self, height=8, width=8, backend='set', compact=False, mines=None,
+                 rng=None, profiler=None, lookahead=None, inference='subset',
+                 compaction=False, max_sentences=None):
         """
         Initialize AI agent.
         
         Args:
             height: Number of rows in the game
             width: Number of columns in the game
+            backend: Sentence representation, 'set' for sets of cells or
+                'bitmask' for integer bitmasks; both make the same deductions
+            compact: Use flat integer indices for cells instead of tuples
+            mines: Total number of mines in the game, if known; used to weigh
+                guesses near revealed cells against guesses elsewhere
+            rng: random.Random instance used to break ties between guesses
+                (default: the random module's shared generator)
+            profiler: PhaseProfiler that records timings and counters, or
+                None to run without instrumentation
+            lookahead: Lookahead used to choose between similarly risky
+                guesses, or None to always take the safest cell
+            inference: 'subset' for subset inference alone, or 'linear' to
+                also run Gaussian elimination over the observed constraints
+                whenever subset inference runs out of deductions
+            compaction: Drop sentences implied by two smaller ones once
+                inference has finished; off by default because subset
+                inference can occasionally miss a deduction without them
+            max_sentences: Most sentences kept after inference, by evicting
+                derived sentences, or None for no limit
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {self.BACKENDS}")
+        if inference not in self.INFERENCE_ENGINES:
+            raise ValueError(f"Unknown inference engine {inference!r}, "
+                             f"expected one of {self.INFERENCE_ENGINES}")
+
         # Set dimensions
         self.height = height
         self.width = width
+        self.total_mines = mines
+        self.rng = rng
+        self.backend = backend
+        self.compact = compact
+        self.profiler = profiler
+        self.lookahead = lookahead
+        self.inference = inference
+
+        # Neighbor tables shared with every game of the same size
+        self.geometry = BoardGeometry.get(height, width)
+        self._neighbors = self.geometry.neighbors(compact)
+        self.codec = FlatCodec() if compact else self.geometry
 
         # Keep track of cells that have been clicked
         self.moves_made = set()
@@ -100,30 +399,331 @@ class MinesweeperAI:
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Cells neither chosen nor known to be mines, in a list so one can be
+        # picked at random, with each cell's position for O(1) removal
+        if compact:
+            self._unknown_cells = list(range(height * width))
+        else:
+            self._unknown_cells = [(i, j) for i in range(height) for j in range(width)]
+        self._unknown_positions = {cell: k for k, cell in enumerate(self._unknown_cells)}
+
+        # Cells known to be safe that have not been chosen yet
+        self._safe_moves = set()
+
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+        # Index from each cell to the sentences that contain it; its keys are
+        # the frontier, the unknown cells that appear in some sentence
+        self.cell_index = {}
+
+        # Sentences created or modified since they were last examined
+        self._pending = deque()
+        self._queued = set()
+
+        # Reduced linear system of the observed constraints for the linear
+        # engine; it is not undo-logged, so rollback marks it stale and it
+        # is rebuilt from the knowledge base when next needed
+        self.linear = LinearSystem() if inference == 'linear' else None
+        self._linear_stale = False
+
+        # Derived sentences, with the order they were derived in, and
+        # (union, part, rest) triples found by subset inference, where
+        # union is implied by the two disjoint sentences part and rest
+        self.compaction = compaction
+        self.max_sentences = max_sentences
+        self._derived = {}
+        self._derivations = 0
+        self._implied = []
+
+        # Sentences dropped by compaction and by the size cap
+        self.compacted = 0
+        self.evicted = 0
+
+        # Undo log of (function, *args) records while a snapshot is open,
+        # or None when nothing needs to be undone
+        self._trail = None
+        self._snapshots = 0
+
+    def to_index(self, cell):
+        """
+        Convert an (i, j) cell to its flat index i * width + j.
+        
+        Args:
+            cell: Tuple (i, j) representing cell coordinates
+        """
+        return self.geometry.index(cell)
+
+    def to_cell(self, index):
+        """
+        Convert a flat index back to an (i, j) cell.
+        
+        Args:
+            index: Flat cell index
+        """
+        return self.geometry.cell(index)
 
     def mark_mine(self, cell):
         """
         Mark a cell as a mine and update all knowledge.
         
         Args:
-            cell: Tuple (i, j) representing cell coordinates
+            cell: Tuple (i, j), or flat index in compact mode
         """
+        trail = self._trail
+        if trail is not None and cell not in self.mines:
+            trail.append((self.mines.discard, cell))
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self._discard_unknown(cell)
+        if self.linear is not None and not self._linear_stale:
+            self.linear.assign(cell, 1)
+        sentences = self.cell_index.pop(cell, ())
+        if trail is not None and sentences:
+            trail.append((self.cell_index.__setitem__, cell, sentences))
+        for sentence in sentences:
+            self._replace_sentence(sentence, sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
         Mark a cell as safe and update all knowledge.
         
         Args:
-            cell: Tuple (i, j) representing cell coordinates
+            cell: Tuple (i, j), or flat index in compact mode
         """
+        trail = self._trail
+        if trail is not None:
+            if cell not in self.safes:
+                trail.append((self.safes.discard, cell))
+            if cell not in self.moves_made and cell not in self._safe_moves:
+                trail.append((self._safe_moves.discard, cell))
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self._safe_moves.add(cell)
+        if self.linear is not None and not self._linear_stale:
+            self.linear.assign(cell, 0)
+        sentences = self.cell_index.pop(cell, ())
+        if trail is not None and sentences:
+            trail.append((self.cell_index.__setitem__, cell, sentences))
+        for sentence in sentences:
+            self._replace_sentence(sentence, sentence.mark_safe(cell))
+
+    def _discard_unknown(self, cell):
+        """
+        Remove a cell from the unknown cells, if present.
+        
+        The last cell in the list is moved into the removed cell's place.
+        
+        Args:
+            cell: Cell that was chosen or found to be a mine
+        """
+        position = self._unknown_positions.pop(cell, None)
+        if position is None:
+            return
+        if self._trail is not None:
+            self._trail.append((self._restore_unknown, cell, position))
+        last = self._unknown_cells.pop()
+        if last != cell:
+            self._unknown_cells[position] = last
+            self._unknown_positions[last] = position
+
+    def _restore_unknown(self, cell, position):
+        """
+        Undo _discard_unknown, putting a cell back where it was.
+        
+        Args:
+            cell: Cell that was removed
+            position: Its position in the list before removal
+        """
+        cells = self._unknown_cells
+        if position < len(cells):
+            moved = cells[position]
+            self._unknown_positions[moved] = len(cells)
+            cells.append(moved)
+            cells[position] = cell
+        else:
+            cells.append(cell)
+        self._unknown_positions[cell] = position
+
+    def _make_sentence(self, cells, count):
+        """
+        Build a sentence using the selected backend.
+        
+        Args:
+            cells: Iterable of cells
+            count: Number of mines among these cells
+        """
+        if self.backend == 'bitmask':
+            return MaskSentence.from_cells(cells, count, self.codec)
+        return Sentence(cells, count)
+
+    def _add_sentence(self, sentence):
+        """
+        Add a sentence to the knowledge base and index it by its cells.
+        
+        Equal sentences are only stored once, whichever way they were derived.
+        
+        Args:
+            sentence: Non-empty sentence to add
+            
+        Returns:
+            True if the sentence was new, False if it was already known
+        """
+        if sentence in self.knowledge:
+            return False
+        trail = self._trail
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            sentences = self.cell_index.get(cell)
+            if sentences is not None:
+                sentences.add(sentence)
+                if trail is not None:
+                    trail.append((sentences.discard, sentence))
+            else:
+                self.cell_index[cell] = {sentence}
+                if trail is not None:
+                    trail.append((self.cell_index.pop, cell))
+        if trail is not None:
+            trail.append((self.knowledge.discard, sentence))
+        self._enqueue(sentence)
+        return True
+
+    def _remove_sentence(self, sentence):
+        """
+        Remove a sentence from the knowledge base and the index.
+        
+        Args:
+            sentence: Sentence to remove
+        """
+        trail = self._trail
+        if trail is not None and sentence in self.knowledge:
+            trail.append((self.knowledge.add, sentence))
+        self.knowledge.discard(sentence)
+        serial = self._derived.pop(sentence, None)
+        if trail is not None and serial is not None:
+            trail.append((self._derived.__setitem__, sentence, serial))
+        for cell in sentence.cells:
+            sentences = self.cell_index.get(cell)
+            if sentences is not None and sentence in sentences:
+                sentences.discard(sentence)
+                if trail is not None:
+                    trail.append((sentences.add, sentence))
+                if not sentences:
+                    del self.cell_index[cell]
+                    if trail is not None:
+                        trail.append((self.cell_index.__setitem__, cell, sentences))
+
+    def _replace_sentence(self, old, new):
+        """
+        Replace a sentence with an updated version of itself.
+        
+        Empty sentences carry no information and are dropped. The updated
+        version of a derived sentence counts as derived too.
+        
+        Args:
+            old: Sentence currently in the knowledge base
+            new: Sentence to store instead
+        """
+        serial = self._derived.get(old)
+        self._remove_sentence(old)
+        if len(new) and self._add_sentence(new) and serial is not None:
+            self._mark_derived(new, serial)
+
+    def _mark_derived(self, sentence, serial):
+        """
+        Record that a sentence was derived rather than observed.
+        
+        Args:
+            sentence: Sentence in the knowledge base
+            serial: Position of the derivation, for evicting the oldest first
+        """
+        self._derived[sentence] = serial
+        if self._trail is not None:
+            self._trail.append((self._derived.pop, sentence))
+
+    def _enqueue(self, sentence):
+        """
+        Schedule a sentence to be examined by the inference loop.
+        
+        Args:
+            sentence: Sentence that was created or modified
+        """
+        if sentence not in self._queued:
+            self._queued.add(sentence)
+            self._pending.append(sentence)
+
+    def snapshot(self):
+        """
+        Start recording changes so they can be undone with rollback.
+        
+        Every change to the agent's knowledge (known cells, moves, sentences
+        and the index) is logged while a snapshot is open, so rolling back
+        costs time proportional to the changes made since, not to the size
+        of the knowledge base. Snapshots can be nested. Sentences are
+        immutable, so the log only has to record which ones were added or
+        removed. The random number generator is not rolled back.
+        
+        Take snapshots between calls, never during one.
+        
+        Returns:
+            Marker to pass to rollback or release
+        """
+        if self._trail is None:
+            self._trail = []
+        self._snapshots += 1
+        return len(self._trail)
+
+    def rollback(self, marker):
+        """
+        Undo every change made since a snapshot and close it.
+        
+        Args:
+            marker: Value returned by snapshot
+        """
+        trail = self._trail
+        while len(trail) > marker:
+            record = trail.pop()
+            record[0](*record[1:])
+        self._pending.clear()
+        self._queued.clear()
+        self._implied.clear()
+        if self.linear is not None:
+            self._linear_stale = True
+        self._close_snapshot()
+
+    def release(self, marker):
+        """
+        Close a snapshot, keeping the changes made since.
+        
+        The changes can still be undone by rolling back an enclosing snapshot.
+        
+        Args:
+            marker: Value returned by snapshot
+        """
+        self._close_snapshot()
+
+    def _close_snapshot(self):
+        """
+        Stop recording once the outermost snapshot is closed.
+        """
+        self._snapshots -= 1
+        if self._snapshots == 0:
+            self._trail = None
+
+    @contextmanager
+    def hypothetical(self):
+        """
+        Context manager that rolls back every change made inside it.
+        
+        Example:
+            with ai.hypothetical():
+                ai.add_knowledge(cell, 2)
+                safe_if_two = set(ai.safes)
+        """
+        marker = self.snapshot()
+        try:
+            yield self
+        finally:
+            self.rollback(marker)
 
     def add_knowledge(self, cell, count):
         """
@@ -138,88 +738,222 @@ class MinesweeperAI:
         5) Add any new sentences to the AI's knowledge base if they can be inferred
         
         Args:
-            cell: Tuple (i, j) representing the revealed cell
+            cell: Tuple (i, j), or flat index in compact mode
             count: Number of mines adjacent to the cell
         """
-        # 1. Mark the cell as a move that has been made
-        self.moves_made.add(cell)
+        self.add_knowledge_many([(cell, count)])
+
+    def add_knowledge_many(self, observations):
+        """
+        Add several revealed cells at once, e.g. a flood-filled opening or a
+        replayed game, running inference only once for the whole batch.
+        
+        Follows the same steps as add_knowledge, except that every cell is
+        marked before any sentence is built, so sentences never include
+        cells revealed in the same batch.
+        
+        Args:
+            observations: Iterable of (cell, count) pairs
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            start = perf_counter()
 
-        # 2. Mark the cell as safe
-        self.mark_safe(cell)
+        self._record_observations(observations)
 
-        # 3. Add a new sentence to the knowledge base
-        # Get all neighboring cells
-        neighbors = set()
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Skip the cell itself
-                if (i, j) == cell:
-                    continue
-                # Only add valid cells that aren't already known
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if (i, j) not in self.safes and (i, j) not in self.mines:
-                        neighbors.add((i, j))
-
-        # Adjust count for known mines in neighbors
-        adjusted_count = count
-        neighbors_copy = neighbors.copy()
-        for neighbor in neighbors_copy:
-            if neighbor in self.mines:
-                adjusted_count -= 1
-                neighbors.remove(neighbor)
-
-        # Add the new sentence if it has unknown cells
-        if len(neighbors) > 0:
-            new_sentence = Sentence(neighbors, adjusted_count)
-            self.knowledge.append(new_sentence)
-
-        # 4. Iteratively mark additional cells as safe or mines
+        # 4 & 5. Mark additional cells and infer new sentences until the
+        # changes made by this batch have been fully propagated
+        self._infer_knowledge()
+
+        if profiler is not None:
+            profiler.record('add_knowledge', perf_counter() - start)
+            profiler.kb_sizes.append(len(self.knowledge))
+
+    def record_observations(self, observations):
+        """
+        Add revealed cells to the knowledge base without running inference,
+        e.g. to weigh a hypothetical reveal before anything is deduced from
+        it. infer_knowledge draws the conclusions afterwards.
+        
+        Args:
+            observations: Iterable of (cell, count) pairs
+        """
+        self._record_observations(observations)
+
+    def infer_knowledge(self):
+        """
+        Draw every conclusion from the sentences added since inference last ran.
+        """
         self._infer_knowledge()
 
-        # 5. Add new sentences using subset inference
-        self._infer_from_subsets()
+    def _record_observations(self, observations):
+        """
+        Steps 1 to 3 of add_knowledge_many: mark the cells and add their
+        sentences, leaving them queued for inference.
+        
+        Args:
+            observations: Iterable of (cell, count) pairs
+        """
+        observations = list(observations)
+
+        # 1 & 2. Mark every cell as a move that has been made and as safe
+        trail = self._trail
+        for cell, count in observations:
+            if trail is not None:
+                if cell not in self.moves_made:
+                    trail.append((self.moves_made.discard, cell))
+                if cell in self._safe_moves:
+                    trail.append((self._safe_moves.add, cell))
+            self.moves_made.add(cell)
+            self._discard_unknown(cell)
+            self._safe_moves.discard(cell)
+            self.mark_safe(cell)
+
+        # 3. Add a new sentence to the knowledge base for each cell
+        for cell, count in observations:
+            # Get all neighboring cells that aren't already known to be safe
+            neighbors = set()
+            for neighbor in self._neighbors[cell]:
+                if neighbor not in self.safes:
+                    neighbors.add(neighbor)
 
-        # Clean up knowledge base (remove empty sentences)
-        self.knowledge = [s for s in self.knowledge if len(s.cells) > 0]
+            # Adjust count for known mines in neighbors
+            adjusted_count = count
+            neighbors_copy = neighbors.copy()
+            for neighbor in neighbors_copy:
+                if neighbor in self.mines:
+                    adjusted_count -= 1
+                    neighbors.remove(neighbor)
+
+            # Add the new sentence if it has unknown cells
+            if len(neighbors) > 0:
+                self._add_sentence(self._make_sentence(neighbors, adjusted_count))
+                if self.linear is not None and not self._linear_stale:
+                    self.linear.add_equation(neighbors, adjusted_count)
 
     def _infer_knowledge(self):
         """
-        Iteratively infer new safe cells and mines from current knowledge.
-        Continues until no new information can be inferred.
-        """
-        knowledge_changed = True
+        Infer new safe cells, mines and sentences from pending sentences.
         
-        while knowledge_changed:
-            knowledge_changed = False
-            
-            safes_to_mark = set()
-            mines_to_mark = set()
+        Only sentences created or modified since they were last examined are
+        processed. Marking a cell replaces the sentences that contained it
+        with updated ones, which are queued as they are added just like
+        derived sentences, so the loop runs until no new information can be
+        inferred.
+        
+        With the linear engine, cells pinned by the reduced linear system
+        are marked whenever the worklist runs dry, and the loop goes on
+        until neither finds anything new.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            start = perf_counter()
+        iterations = 0
+
+        while True:
+            while self._pending:
+                iterations += 1
+                sentence = self._pending.popleft()
+                self._queued.discard(sentence)
 
-            # Check each sentence for definite conclusions
-            for sentence in self.knowledge:
-                # Find known mines
+                # Skip sentences replaced or removed since they were queued
+                if sentence not in self.knowledge:
+                    continue
+
+                # Mark known mines and safes, which replaces the sentence
                 known_mines = sentence.known_mines()
                 if known_mines:
-                    mines_to_mark.update(known_mines)
-                    knowledge_changed = True
+                    for mine in known_mines:
+                        self.mark_mine(mine)
+                    continue
 
-                # Find known safes
                 known_safes = sentence.known_safes()
                 if known_safes:
-                    safes_to_mark.update(known_safes)
-                    knowledge_changed = True
+                    for safe in known_safes:
+                        self.mark_safe(safe)
+                    continue
+
+                self._infer_from_subsets(sentence)
+
+            # Marking cells pinned by the linear system queues more work
+            if self.linear is None or not self._infer_linear():
+                break
+
+        self._compact_knowledge()
+
+        if profiler is not None:
+            profiler.record('infer_knowledge', perf_counter() - start)
+            profiler.count('infer_iterations', iterations)
+
+    def _compact_knowledge(self):
+        """
+        Drop redundant sentences, then evict derived sentences over the cap.
+        
+        Equal sentences are never stored twice, whichever way they were
+        derived. Beyond that, when subset inference finds A inside B it adds
+        B - A, after which B says nothing that A and B - A do not: it is
+        the union of two disjoint siblings. Such unions are dropped as long
+        as both parts are still present. The smaller parts are kept rather
+        than the union because subset inference gets more out of them, and
+        every dropped sentence is larger than the two it is implied by, so
+        dropping one never invalidates the reason for dropping another.
+        Nothing true is lost, but a later sentence that straddles both parts
+        can no longer be compared with the union, so subset inference
+        occasionally misses a deduction it would otherwise have made. That
+        is why compaction is opt-in.
+        
+        Evicting a derived sentence can lose information, unlike compaction,
+        so it only happens with max_sentences set. The largest are evicted
+        first, oldest first among equal sizes; observed sentences are kept.
+        """
+        knowledge = self.knowledge
+        trail = self._trail
+
+        implied, self._implied = self._implied, []
+        dropped = 0
+        for union, part, rest in implied:
+            if union in knowledge and part in knowledge and rest in knowledge:
+                self._remove_sentence(union)
+                dropped += 1
+        if dropped:
+            if trail is not None:
+                trail.append((setattr, self, 'compacted', self.compacted))
+            self.compacted += dropped
 
-            # Mark all newly identified safe cells
-            for safe in safes_to_mark:
-                self.mark_safe(safe)
+        excess = 0 if self.max_sentences is None else len(knowledge) - self.max_sentences
+        if excess > 0 and self._derived:
+            derived = self._derived
+            victims = sorted(derived, key=lambda sentence: (-len(sentence), derived[sentence]))
+            victims = victims[:excess]
+            for sentence in victims:
+                self._remove_sentence(sentence)
+            if trail is not None:
+                trail.append((setattr, self, 'evicted', self.evicted))
+            self.evicted += len(victims)
 
-            # Mark all newly identified mines
-            for mine in mines_to_mark:
-                self.mark_mine(mine)
+    def _infer_linear(self):
+        """
+        Mark the cells pinned by the linear system, rebuilding it first if a
+        rollback left it stale. Marking queues the affected sentences.
+
+        Returns:
+            True if any new cell was marked
+        """
+        if self._linear_stale:
+            self.linear = LinearSystem.from_sentences(self.knowledge)
+            self._linear_stale = False
+        safes, mines = self.linear.forced()
+        mines -= self.mines
+        safes -= self.safes
+        for mine in mines:
+            self.mark_mine(mine)
+        for safe in safes:
+            self.mark_safe(safe)
+        return bool(mines or safes)
 
-    def _infer_from_subsets(self):
+    def _infer_from_subsets(self, sentence):
         """
-        Use subset inference to generate new sentences.
+        Use subset inference to generate new sentences from a sentence.
         
         If sentence A is a subset of sentence B, we can infer:
         B.cells - A.cells = B.count - A.count
@@ -228,31 +962,40 @@ class MinesweeperAI:
         {A, B, C} = 2
         {A, B, C, D, E} = 3
         => {D, E} = 1
+        
+        Only sentences sharing at least one cell with the given sentence can
+        be a subset or superset of it, so those are found through the index.
+        
+        Args:
+            sentence: Sentence to compare against overlapping sentences
         """
-        new_sentences = []
+        overlapping = set()
+        for cell in sentence.cells:
+            overlapping.update(self.cell_index[cell])
+        overlapping.discard(sentence)
+        if self.profiler is not None:
+            self.profiler.count('subset_comparisons', len(overlapping))
 
-        for s1 in self.knowledge:
-            for s2 in self.knowledge:
-                # Skip if same sentence
-                if s1 == s2:
-                    continue
+        for other in overlapping:
+            # Work out which sentence is contained in the other
+            if sentence.is_proper_subset(other):
+                subset, superset = sentence, other
+            elif other.is_proper_subset(sentence):
+                subset, superset = other, sentence
+            else:
+                continue
 
-                # Check if s1 is a subset of s2
-                if s1.cells and s2.cells and s1.cells.issubset(s2.cells):
-                    # Create new sentence from the difference
-                    new_cells = s2.cells - s1.cells
-                    new_count = s2.count - s1.count
+            # Create new sentence from the difference
+            new_sentence = superset.difference(subset)
 
-                    # Only add if it's a valid new sentence
-                    if len(new_cells) > 0:
-                        new_sentence = Sentence(new_cells, new_count)
-                        
-                        # Check if this sentence is not already in knowledge
-                        if new_sentence not in self.knowledge and new_sentence not in new_sentences:
-                            new_sentences.append(new_sentence)
+            # Duplicates are ignored by the knowledge base
+            if self._add_sentence(new_sentence):
+                self._derivations += 1
+                self._mark_derived(new_sentence, self._derivations)
 
-        # Add all new sentences to knowledge base
-        self.knowledge.extend(new_sentences)
+            # The superset now follows from the subset and the difference
+            if self.compaction:
+                self._implied.append((superset, subset, new_sentence))
 
     def make_safe_move(self):
         """
@@ -261,10 +1004,15 @@ class MinesweeperAI:
         The move must be known to be safe, and not already a move that has been made.
         Returns None if no safe move can be guaranteed.
         """
-        for cell in self.safes:
-            if cell not in self.moves_made:
-                return cell
-        return None
+        profiler = self.profiler
+        if profiler is not None:
+            start = perf_counter()
+
+        move = next(iter(self._safe_moves), None)
+
+        if profiler is not None:
+            profiler.record('make_safe_move', perf_counter() - start)
+        return move
 
     def make_random_move(self):
         """
@@ -274,45 +1022,149 @@ class MinesweeperAI:
             1) have not already been chosen, and
             2) are not known to be mines
             
-        Uses probability calculation to prefer cells with lower mine likelihood.
+        Uses exact mine probabilities, computed over every arrangement of
+        mines consistent with the knowledge base, to pick the cell least
+        likely to be a mine. Ties are broken randomly.
         """
-        # Get all possible moves
-        possible_moves = []
-        
-        for i in range(self.height):
-            for j in range(self.width):
-                cell = (i, j)
-                if cell not in self.moves_made and cell not in self.mines:
-                    possible_moves.append(cell)
+        profiler = self.profiler
+        if profiler is None:
+            return self._choose_guess()
 
+        start = perf_counter()
+        move = self._choose_guess()
+        profiler.record('make_random_move', perf_counter() - start)
+        return move
+
+    def _choose_guess(self):
+        """
+        Pick the unknown cell least likely to be a mine, for make_random_move.
+        """
         # If no moves available, return None
-        if not possible_moves:
+        if not self._unknown_cells:
             return None
 
-        # Calculate probabilities for cells involved in knowledge sentences
-        cell_probabilities = {}
-        
-        for sentence in self.knowledge:
-            if len(sentence.cells) > 0:
-                # Probability that each cell in this sentence is a mine
-                prob = sentence.count / len(sentence.cells)
-                for cell in sentence.cells:
-                    if cell in possible_moves:
-                        # Take the maximum probability across all sentences
-                        if cell not in cell_probabilities:
-                            cell_probabilities[cell] = prob
-                        else:
-                            cell_probabilities[cell] = max(cell_probabilities[cell], prob)
+        # Calculate exact probabilities for cells involved in knowledge sentences
+        unconstrained = self.unconstrained_count()
+        cell_probabilities, outside = self._probabilities(unconstrained)
+
+        # Weigh what the least risky guesses would teach, if asked to; the
+        # profiler is set aside so hypothetical reveals are not timed
+        if self.lookahead is not None:
+            profiler, self.profiler = self.profiler, None
+            try:
+                move = self.lookahead.choose(self, cell_probabilities, outside, unconstrained)
+            finally:
+                self.profiler = profiler
+            if move is not None:
+                return move
+
+        # Cells not in any sentence share one probability, when it is known
+        if outside is not None and unconstrained:
+            if not cell_probabilities or outside < min(cell_probabilities.values()):
+                return self.random_unconstrained(unconstrained)
 
         # If we have probability information, choose the safest cell
         if cell_probabilities:
             # Find minimum probability
             min_prob = min(cell_probabilities.values())
             safest_moves = [cell for cell, prob in cell_probabilities.items() if prob == min_prob]
-            return random.choice(safest_moves)
+            return self._rng().choice(safest_moves)
         
         # Otherwise, choose randomly from all possible moves
-        return random.choice(possible_moves)
+        return self._rng().choice(self._unknown_cells)
+
+    def unknown_count(self):
+        """
+        Number of cells neither chosen nor known to be mines.
+        """
+        return len(self._unknown_cells)
+
+    def is_unknown(self, cell):
+        """
+        Check whether a cell is neither chosen nor known to be a mine.
+        """
+        return cell in self._unknown_positions
+
+    def pending_safe_moves(self):
+        """
+        Cells known to be safe that have not been chosen yet, as a frozenset.
+        """
+        return frozenset(self._safe_moves)
+
+    def neighbors(self, cell):
+        """
+        Tuple of the cells adjacent to a cell.
+        """
+        return self._neighbors[cell]
+
+    def _rng(self):
+        """
+        Generator for guesses: the agent's own, or the random module's shared one.
+        """
+        return self.rng if self.rng is not None else random
+
+    def unconstrained_count(self):
+        """
+        Number of unknown cells that are neither in a sentence nor known safe.
+        """
+        return len(self._unknown_cells) - len(self.cell_index) - len(self._safe_moves)
+
+    def random_unconstrained(self, unconstrained):
+        """
+        Pick a random unknown cell that is not in any sentence.
+        
+        Random unknown cells are tried first, which takes a few attempts when
+        most unknown cells are unconstrained; otherwise the candidates are
+        listed.
+        
+        Args:
+            unconstrained: Number of such cells, as from unconstrained_count
+        """
+        cells = self._unknown_cells
+        if unconstrained * 8 >= len(cells):
+            for _ in range(32):
+                cell = self._rng().choice(cells)
+                if cell not in self.cell_index and cell not in self._safe_moves:
+                    return cell
+        return self._rng().choice([cell for cell in cells
+                                   if cell not in self.cell_index and cell not in self._safe_moves])
+
+    def _probabilities(self, unconstrained):
+        """
+        Compute mine probabilities from the current knowledge.
+        
+        Args:
+            unconstrained: Number of unknown cells not in any sentence
+            
+        Returns:
+            Tuple (probabilities, outside) as returned by frontier_probabilities
+        """
+        return frontier_probabilities(self.knowledge, unconstrained, self.mines_left())
+
+    def mines_left(self):
+        """
+        Number of mines not yet identified, or None if the total is unknown.
+        """
+        if self.total_mines is None:
+            return None
+        return self.total_mines - len(self.mines)
+
+    def mine_probabilities(self, unconstrained=None):
+        """
+        Get the probability that each unknown cell in a sentence is a mine.
+        
+        Args:
+            unconstrained: Number of unknown cells not in any sentence, if
+                already known from unconstrained_count
+            
+        Returns:
+            Tuple (probabilities, outside): a dictionary mapping each frontier
+            cell to its mine probability, and the probability for any other
+            unknown cell (None unless the total number of mines is known)
+        """
+        if unconstrained is None:
+            unconstrained = self.unconstrained_count()
+        return self._probabilities(unconstrained)
 
     def get_knowledge_summary(self):
         """
@@ -326,5 +1178,8 @@ class MinesweeperAI:
             'known_safes': len(self.safes),
             'known_mines': len(self.mines),
             'sentences': len(self.knowledge),
-            'total_cells_in_sentences': sum(len(s.cells) for s in self.knowledge)
+            'derived_sentences': len(self._derived),
+            'total_cells_in_sentences': sum(len(s) for s in self.knowledge),
+            'compacted': self.compacted,
+            'evicted': self.evicted
         }
@@ -0,0 +1,263 @@
+"""
+Minesweeper Batch Simulator
+Plays thousands of games in lockstep on stacked NumPy arrays.
+"""
+
+import random
+
+from ai_agent import MinesweeperAI
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only this module needs it
+    np = None
+
+# Game status codes
+PLAYING = 0
+WON = 1
+LOST = -1
+
+
+def _neighbor_sum(grids):
+    """
+    Sum of the 8 neighbors of every cell, for a stack of grids.
+
+    Args:
+        grids: Array of shape (games, height, width) of 0/1 values
+
+    Returns:
+        Array of the same shape with small integer counts
+    """
+    games, height, width = grids.shape
+    padded = np.zeros((games, height + 2, width + 2), dtype=np.int16)
+    padded[:, 1:-1, 1:-1] = grids
+    total = np.zeros((games, height, width), dtype=np.int16)
+    for di in range(3):
+        for dj in range(3):
+            if di != 1 or dj != 1:
+                total += padded[:, di:di + height, dj:dj + width]
+    return total
+
+
+class BatchSimulator:
+    """
+    Plays a batch of games on boards of one size, all advancing together.
+
+    The boards are stacked into arrays of shape (games, height, width): mine
+    masks, nearby-mine counts, and revealed and known-mine masks. Every step
+    works on all unfinished games at once:
+
+    1. Open regions: neighbors of revealed zero cells are revealed
+    2. Trivial deductions: around each revealed number, if its mines are all
+       known the other hidden neighbors are safe, and if its hidden
+       neighbors are all needed for its count they are mines. Safe cells
+       found this way are revealed, each counting as a safe move.
+    3. Games where neither rule made progress fall back to their own
+       MinesweeperAI, created on first need and brought up to date with
+       the cells revealed since. Its subset inference may find safe cells
+       or mines; otherwise it makes its probabilistic guess.
+
+    The deductions are the same ones MinesweeperAI makes, so games are won
+    and lost at the same rate as by run_single_game; only the order in
+    which safe cells are opened differs, which can change the move counts
+    slightly.
+    """
+
+    def __init__(self, height, width, mines, games, seed=None):
+        """
+        Generate the boards.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+            mines: Number of mines on every board
+            games: Number of games in the batch
+            seed: Seed for the boards and the guesses, or None
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("BatchSimulator requires NumPy (pip install numpy)")
+
+        self.height = height
+        self.width = width
+        self.mines = mines
+        self.games = games
+        self.generator = np.random.default_rng(seed)
+
+        # Place mines by taking the cells with the smallest random keys
+        size = height * width
+        keys = self.generator.random((games, size))
+        positions = np.argpartition(keys, min(mines, size - 1), axis=1)[:, :mines]
+        mine = np.zeros((games, size), dtype=bool)
+        np.put_along_axis(mine, positions, True, axis=1)
+        self.mine = mine.reshape(games, height, width)
+        self.counts = _neighbor_sum(self.mine)
+
+        self.revealed = np.zeros((games, height, width), dtype=bool)
+        self.known_mine = np.zeros((games, height, width), dtype=bool)
+        self.status = np.full(games, PLAYING, dtype=np.int8)
+        self.safe_moves = np.zeros(games, dtype=np.int64)
+        self.random_moves = np.zeros(games, dtype=np.int64)
+
+        # Per-game agents, created when a game first needs one, and what
+        # each agent has been told so far
+        self.agents = [None] * games
+        self.ai_seeds = self.generator.integers(0, 2 ** 63, games)
+        self.synced_revealed = np.zeros((games, height, width), dtype=bool)
+        self.synced_mines = np.zeros((games, height, width), dtype=bool)
+
+    def run(self):
+        """
+        Play every game to the end.
+
+        Returns:
+            List of result dictionaries in game order, as from run_single_game
+        """
+        # Opening guess: a uniformly random cell, as an agent without
+        # knowledge would choose
+        first = self.generator.integers(0, self.height * self.width, self.games)
+        for game, index in enumerate(first):
+            self._reveal_guess(game, int(index))
+        self._check_won(np.arange(self.games))
+
+        while True:
+            active = np.flatnonzero(self.status == PLAYING)
+            if len(active) == 0:
+                break
+            stalled = self._step(active)
+            for game in stalled:
+                self._agent_step(int(game))
+            self._check_won(active)
+
+        return [self._result(game) for game in range(self.games)]
+
+    def _step(self, active):
+        """
+        Open regions and apply the trivial deductions to unfinished games.
+
+        Args:
+            active: Indices of the games still playing
+
+        Returns:
+            Indices of the games where no progress was made
+        """
+        revealed = self.revealed[active]
+        known_mine = self.known_mine[active]
+        counts = self.counts[active]
+        zero = counts == 0
+        revealed_before = revealed.sum(axis=(1, 2))
+
+        # 1. Reveal neighbors of revealed zero cells until the regions close
+        while True:
+            opened = (_neighbor_sum(revealed & zero) > 0) & ~revealed
+            if not opened.any():
+                break
+            revealed |= opened
+
+        # 2. Compare each revealed count with its known and hidden neighbors
+        unknown = ~revealed & ~known_mine
+        remaining = counts - _neighbor_sum(known_mine)
+        hidden = _neighbor_sum(unknown)
+        constrained = revealed & (hidden > 0)
+        new_safe = unknown & (_neighbor_sum(constrained & (remaining == 0)) > 0)
+        new_mine = unknown & (_neighbor_sum(constrained & (remaining == hidden)) > 0)
+
+        revealed |= new_safe
+        known_mine |= new_mine
+        self.revealed[active] = revealed
+        self.known_mine[active] = known_mine
+
+        found_safe = new_safe.sum(axis=(1, 2))
+        self.safe_moves[active] += found_safe
+        progress = ((revealed.sum(axis=(1, 2)) > revealed_before + found_safe) |
+                    (found_safe > 0) | new_mine.any(axis=(1, 2)))
+        return active[~progress]
+
+    def _agent_step(self, game):
+        """
+        Let a game's MinesweeperAI move when the trivial deductions are stuck.
+
+        The agent is told about every cell revealed and every mine found
+        since it was last used. Safe cells it deduces are all revealed; if
+        there are none and it found no new mines, it guesses.
+
+        Args:
+            game: Index of the game
+        """
+        ai = self.agents[game]
+        if ai is None:
+            ai = self.agents[game] = MinesweeperAI(
+                height=self.height, width=self.width, compact=True, mines=self.mines,
+                rng=random.Random(int(self.ai_seeds[game])))
+
+        revealed = self.revealed[game].ravel()
+        known_mine = self.known_mine[game].ravel()
+        counts = self.counts[game].ravel()
+        for index in np.flatnonzero(known_mine & ~self.synced_mines[game].ravel()):
+            ai.mark_mine(int(index))
+        new_cells = np.flatnonzero(revealed & ~self.synced_revealed[game].ravel())
+        ai.add_knowledge_many((int(index), int(counts[index])) for index in new_cells)
+        self.synced_revealed[game] = self.revealed[game]
+
+        mines_before = int(known_mine.sum())
+        if ai.mines:
+            known_mine[list(ai.mines)] = True
+        self.synced_mines[game] = self.known_mine[game]
+
+        safe = list(ai.pending_safe_moves())
+        if safe:
+            revealed[safe] = True
+            self.safe_moves[game] += len(safe)
+        elif int(known_mine.sum()) == mines_before:
+            move = ai.make_random_move()
+            if move is None:
+                self.status[game] = LOST
+            else:
+                self._reveal_guess(game, move)
+
+    def _reveal_guess(self, game, index):
+        """
+        Reveal a guessed cell, ending the game if it is a mine.
+
+        Args:
+            game: Index of the game
+            index: Flat index of the guessed cell
+        """
+        self.random_moves[game] += 1
+        if self.mine[game].ravel()[index]:
+            self.status[game] = LOST
+        else:
+            self.revealed[game].ravel()[index] = True
+
+    def _check_won(self, games):
+        """
+        Mark games won once every safe cell is revealed.
+
+        Args:
+            games: Indices of the games to check
+        """
+        safe_cells = self.height * self.width - self.mines
+        playing = games[self.status[games] == PLAYING]
+        done = self.revealed[playing].sum(axis=(1, 2)) == safe_cells
+        self.status[playing[done]] = WON
+
+    def _result(self, game):
+        """
+        Result dictionary of a finished game, as from run_single_game.
+        """
+        safe_moves = int(self.safe_moves[game])
+        random_moves = int(self.random_moves[game])
+        moves = safe_moves + random_moves
+        return {
+            'won': bool(self.status[game] == WON),
+            'moves': moves,
+            'safe_moves': safe_moves,
+            'random_moves': random_moves,
+            'height': self.height,
+            'width': self.width,
+            'mines': self.mines,
+            'revealed': int(self.revealed[game].sum()),
+            'accuracy': safe_moves / moves if moves > 0 else 0
+        }
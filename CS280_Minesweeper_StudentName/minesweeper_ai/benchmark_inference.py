@@ -0,0 +1,133 @@
+"""
+Minesweeper Inference Benchmark
+Replays the same boards with each inference engine and compares time and deductions per move.
+"""
+
+import argparse
+import random
+import time
+
+from minesweeper import Minesweeper
+from ai_agent import MinesweeperAI
+from corpus import BoardCorpus
+
+
+def play_benchmark_game(height, width, mines, layout, first_move, inference, seed):
+    """
+    Play one corpus board, timing every knowledge update.
+
+    Args:
+        height: Number of rows
+        width: Number of columns
+        mines: Number of mines
+        layout: Flat indices of the mines
+        first_move: Flat index of the opening click
+        inference: Inference engine of the agent
+        seed: Seed for the agent's guesses
+
+    Returns:
+        Dictionary with won, moves, update_time (seconds spent in
+        add_knowledge_many) and deductions (cells the agent worked out
+        beyond the ones it was shown)
+    """
+    rng = random.Random(seed)
+    game = Minesweeper(height=height, width=width, mines=mines, compact=True,
+                       rng=rng, layout=layout)
+    ai = MinesweeperAI(height=height, width=width, compact=True, mines=mines, rng=rng,
+                       inference=inference)
+    safe_cells = height * width - mines
+
+    won = False
+    moves = 0
+    update_time = 0.0
+    deductions = 0
+    move = first_move
+    while move is not None and not game.is_mine(move):
+        moves += 1
+        newly_revealed = game.reveal(move)
+        known = len(ai.mines) + len(ai.safes)
+        shown = sum(1 for cell, count in newly_revealed if cell not in ai.safes)
+
+        start = time.perf_counter()
+        ai.add_knowledge_many(newly_revealed)
+        update_time += time.perf_counter() - start
+        deductions += len(ai.mines) + len(ai.safes) - known - shown
+
+        if len(game.revealed) == safe_cells:
+            won = True
+            break
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+
+    return {'won': won, 'moves': moves, 'update_time': update_time, 'deductions': deductions}
+
+
+def compare_engines(corpus, engines=MinesweeperAI.INFERENCE_ENGINES, seed=0):
+    """
+    Play every corpus board with each inference engine.
+
+    Each board gets the same guess seed under every engine, so the games
+    only diverge once one engine deduces something the other cannot.
+
+    Args:
+        corpus: BoardCorpus to replay
+        engines: Inference engines to compare
+        seed: Master seed for the agents' guesses
+
+    Returns:
+        Dictionary of summaries by engine, each with games, wins, win_rate,
+        moves, ms_per_move and deductions_per_move
+    """
+    master = random.Random(seed)
+    seeds = [master.getrandbits(64) for _ in range(len(corpus))]
+
+    summaries = {}
+    for inference in engines:
+        games = wins = moves = deductions = 0
+        update_time = 0.0
+        for (layout, first_move), game_seed in zip(corpus, seeds):
+            result = play_benchmark_game(corpus.height, corpus.width, corpus.mines,
+                                         layout, first_move, inference, game_seed)
+            games += 1
+            wins += result['won']
+            moves += result['moves']
+            update_time += result['update_time']
+            deductions += result['deductions']
+        summaries[inference] = {
+            'games': games,
+            'wins': wins,
+            'win_rate': wins / games if games else 0,
+            'moves': moves,
+            'ms_per_move': update_time * 1000 / moves if moves else 0,
+            'deductions_per_move': deductions / moves if moves else 0
+        }
+    return summaries
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Compare the inference engines on the same boards.")
+    parser.add_argument('--corpus', help="corpus file to replay (default: generate boards)")
+    parser.add_argument('--height', type=int, default=16, help="board height for generated boards")
+    parser.add_argument('--width', type=int, default=30, help="board width for generated boards")
+    parser.add_argument('--mines', type=int, default=99, help="mines on generated boards")
+    parser.add_argument('--count', type=int, default=200, help="number of generated boards")
+    parser.add_argument('--seed', type=int, default=0, help="seed for boards and guesses")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = BoardCorpus.load(args.corpus)
+    else:
+        corpus = BoardCorpus.generate(args.height, args.width, args.mines,
+                                      args.count, args.seed)
+
+    print(f"{len(corpus)} boards, {corpus.height}x{corpus.width} with {corpus.mines} mines")
+    print(f"{'Engine':<10} {'Win Rate':>9} {'Moves':>8} {'ms/move':>9} {'Deduced/move':>13}")
+    for inference, summary in compare_engines(corpus, seed=args.seed).items():
+        print(f"{inference:<10} {summary['win_rate']:>8.1%} {summary['moves']:>8} "
+              f"{summary['ms_per_move']:>9.3f} {summary['deductions_per_move']:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
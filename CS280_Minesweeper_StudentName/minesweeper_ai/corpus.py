@@ -0,0 +1,185 @@
+"""
+Minesweeper Board Corpus
+Stores pre-generated boards compactly so benchmarks can replay identical games.
+"""
+
+import argparse
+import random
+import struct
+
+from minesweeper import Minesweeper
+
+# File header: magic, format version, height, width, mines, number of boards
+HEADER = struct.Struct('<4sBHHII')
+MAGIC = b'MSWC'
+VERSION = 1
+
+# Per-board record prefix: flat index of the first click
+FIRST_CLICK = struct.Struct('<I')
+
+
+def pack_layout(mine_indices, size):
+    """
+    Pack mine positions into a bitset, one bit per cell in flat index order.
+
+    Args:
+        mine_indices: Flat indices of the mines
+        size: Number of cells on the board
+
+    Returns:
+        Bytes of length ceil(size / 8)
+    """
+    bits = 0
+    for index in mine_indices:
+        bits |= 1 << index
+    return bits.to_bytes((size + 7) // 8, 'little')
+
+
+def unpack_layout(packed):
+    """
+    Unpack a bitset made by pack_layout.
+
+    Args:
+        packed: Bitset bytes
+
+    Returns:
+        List of the flat indices of the mines, in increasing order
+    """
+    bits = int.from_bytes(packed, 'little')
+    mine_indices = []
+    while bits:
+        lowest = bits & -bits
+        mine_indices.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return mine_indices
+
+
+class BoardCorpus:
+    """
+    A fixed set of boards of one size, each with a first click.
+
+    Every board is stored as the flat index of its first click followed by
+    a bitset of its mines, so an expert board (16x30) takes 64 bytes and
+    10,000 of them fit in well under a megabyte. The first click is a cell
+    with no nearby mines when the board has one, so replays start by
+    opening a region the way the classic game does, and is always safe.
+    """
+
+    def __init__(self, height, width, mines, boards=None):
+        """
+        Create a corpus.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+            mines: Number of mines on every board
+            boards: List of (packed layout, first click) pairs
+        """
+        self.height = height
+        self.width = width
+        self.mines = mines
+        self.boards = boards if boards is not None else []
+
+    @classmethod
+    def generate(cls, height, width, mines, count, seed=None):
+        """
+        Generate boards from a seed.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+            mines: Number of mines on every board
+            count: Number of boards
+            seed: Seed for the generator, so the same seed gives the same corpus
+
+        Returns:
+            BoardCorpus with count boards
+        """
+        rng = random.Random(seed)
+        size = height * width
+        boards = []
+        for _ in range(count):
+            game = Minesweeper(height=height, width=width, mines=mines, compact=True, rng=rng)
+            mask, counts = game.mask, game.counts
+            safe = [index for index in range(size) if not mask[index]]
+            zeros = [index for index in safe if counts[index] == 0]
+            first_click = rng.choice(zeros or safe)
+            mine_indices = [index for index in range(size) if mask[index]]
+            boards.append((pack_layout(mine_indices, size), first_click))
+        return cls(height, width, mines, boards)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a corpus written by save.
+
+        Args:
+            path: File to read
+
+        Returns:
+            The loaded BoardCorpus
+
+        Raises:
+            ValueError: If the file is not a corpus of a supported version
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, height, width, mines, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} board corpus")
+
+        layout_size = (height * width + 7) // 8
+        record_size = FIRST_CLICK.size + layout_size
+        boards = []
+        offset = HEADER.size
+        for _ in range(count):
+            first_click, = FIRST_CLICK.unpack_from(data, offset)
+            start = offset + FIRST_CLICK.size
+            boards.append((data[start:start + layout_size], first_click))
+            offset += record_size
+        return cls(height, width, mines, boards)
+
+    def save(self, path):
+        """
+        Write the corpus to a file.
+
+        Args:
+            path: File to write
+        """
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.height, self.width,
+                                self.mines, len(self.boards)))
+            for packed, first_click in self.boards:
+                f.write(FIRST_CLICK.pack(first_click))
+                f.write(packed)
+
+    def __len__(self):
+        return len(self.boards)
+
+    def __iter__(self):
+        """
+        Yield (mine indices, first click) for every board, in order.
+        """
+        for packed, first_click in self.boards:
+            yield unpack_layout(packed), first_click
+
+
+def main():
+    """Generate a corpus file from the command line."""
+    parser = argparse.ArgumentParser(description="Generate a Minesweeper board corpus.")
+    parser.add_argument('height', type=int, help="number of rows")
+    parser.add_argument('width', type=int, help="number of columns")
+    parser.add_argument('mines', type=int, help="number of mines on each board")
+    parser.add_argument('output', help="corpus file to write")
+    parser.add_argument('--count', type=int, default=10000, help="number of boards")
+    parser.add_argument('--seed', type=int, default=0, help="generator seed")
+    args = parser.parse_args()
+
+    corpus = BoardCorpus.generate(args.height, args.width, args.mines, args.count, args.seed)
+    corpus.save(args.output)
+    print(f"Wrote {len(corpus)} {args.height}x{args.width} boards with "
+          f"{args.mines} mines to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
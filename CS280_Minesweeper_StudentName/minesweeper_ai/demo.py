@@ -5,6 +5,7 @@ Shows AI capabilities with detailed logging and better first-move strategy.
 
 from minesweeper import Minesweeper
 from ai_agent import MinesweeperAI
+from geometry import BoardGeometry
 import random
 
 
@@ -19,14 +20,14 @@ def run_demo_game():
     # Create game
     HEIGHT, WIDTH, MINES = 8, 8, 10
     game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-    ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+    ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
     
     print(f"\nBoard Configuration: {HEIGHT}x{WIDTH} with {MINES} mines")
     print(f"Total cells: {HEIGHT * WIDTH}")
     print(f"Safe cells to reveal: {HEIGHT * WIDTH - MINES}")
     
     # Track game state
-    revealed = set()
+    revealed = game.revealed
     move_count = 0
     safe_moves = 0
     random_moves = 0
@@ -84,18 +85,20 @@ def run_demo_game():
             print(f"  • Completion: {len(revealed)/(HEIGHT*WIDTH-MINES)*100:.1f}%")
             return False
         
-        # Reveal the cell
-        revealed.add(move)
-        nearby = game.nearby_mines(move)
+        # Reveal the cell, along with any open region around it
+        newly_revealed = game.reveal(move)
+        nearby = newly_revealed[0][1]
         
         print(f"RESULT: Safe! ✓")
         print(f"Nearby mines: {nearby}")
+        if len(newly_revealed) > 1:
+            print(f"Opened {len(newly_revealed) - 1} more cells with no nearby mines")
         
         # Show which new knowledge was gained
         old_sentence_count = len(ai.knowledge)
         
         # Update AI knowledge
-        ai.add_knowledge(move, nearby)
+        ai.add_knowledge_many(newly_revealed)
         
         new_sentence_count = len(ai.knowledge)
         
@@ -140,9 +143,9 @@ def run_multiple_demos(num_games=10):
         # Run simplified version
         HEIGHT, WIDTH, MINES = 8, 8, 10
         game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-        ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+        ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
         
-        revealed = set()
+        revealed = game.revealed
         move_count = 0
         safe_move_count = 0
         won = False
@@ -165,9 +168,7 @@ def run_multiple_demos(num_games=10):
                 print(f"  Game Over: Mine hit on move {move_count}")
                 break
             
-            revealed.add(move)
-            nearby = game.nearby_mines(move)
-            ai.add_knowledge(move, nearby)
+            ai.add_knowledge_many(game.reveal(move))
             
             # Check win
             if len(revealed) == HEIGHT * WIDTH - MINES:
@@ -215,11 +216,7 @@ def demonstrate_inference():
     count = 2
     
     # Get neighbors
-    neighbors = []
-    for i in range(cell[0] - 1, cell[0] + 2):
-        for j in range(cell[1] - 1, cell[1] + 2):
-            if (i, j) != cell and 0 <= i < 8 and 0 <= j < 8:
-                neighbors.append((i, j))
+    neighbors = BoardGeometry.get(8, 8).neighbor_cells[cell]
     
     print(f"  Initial knowledge: {set(neighbors)} = {count}")
     print(f"  (2 of these {len(neighbors)} cells contain mines)")
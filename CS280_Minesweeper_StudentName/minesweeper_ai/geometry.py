@@ -0,0 +1,112 @@
+"""
+Board Geometry
+Precomputed neighbor tables shared by every game and agent with the same board size.
+"""
+
+import weakref
+
+
+class BoardGeometry:
+    """
+    Neighbor tables for a board of a given size.
+
+    Geometries are immutable and cached per (height, width), so use
+    BoardGeometry.get() rather than the constructor: every game, agent and
+    concurrent session of the same size then shares one set of tables.
+    The cache only holds geometries weakly, so a geometry and its tables
+    are freed along with the last game or agent that uses them.
+
+    Cells are addressed either as (i, j) tuples or as flat indices
+    i * width + j, and a table is available for each form.
+    """
+
+    __slots__ = ('height', 'width', 'size', '_neighbor_indices', '_neighbor_cells',
+                 '__weakref__')
+
+    # Geometries in use, keyed by (height, width)
+    _cache = weakref.WeakValueDictionary()
+
+    def __init__(self, height, width):
+        """
+        Create the geometry for a board size.
+
+        Each neighbor table is computed once, the first time it is used.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+        """
+        self.height = height
+        self.width = width
+        self.size = height * width
+        self._neighbor_indices = None
+        self._neighbor_cells = None
+
+    @classmethod
+    def get(cls, height, width):
+        """
+        Return the shared geometry for a board size, building it if no game
+        or agent of that size is using one.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+        """
+        key = (height, width)
+        geometry = cls._cache.get(key)
+        if geometry is None:
+            geometry = cls._cache.setdefault(key, cls(height, width))
+        return geometry
+
+    @property
+    def neighbor_indices(self):
+        """
+        Tuple holding, for each flat index, a tuple of its neighbors' indices.
+        """
+        if self._neighbor_indices is None:
+            height, width = self.height, self.width
+            neighbor_indices = []
+            for i in range(height):
+                rows = range(max(i - 1, 0), min(i + 2, height))
+                for j in range(width):
+                    cols = range(max(j - 1, 0), min(j + 2, width))
+                    neighbor_indices.append(tuple(
+                        ni * width + nj
+                        for ni in rows for nj in cols
+                        if ni != i or nj != j
+                    ))
+            self._neighbor_indices = tuple(neighbor_indices)
+        return self._neighbor_indices
+
+    @property
+    def neighbor_cells(self):
+        """
+        Dictionary mapping each (i, j) cell to a tuple of its neighbor cells.
+        """
+        if self._neighbor_cells is None:
+            width = self.width
+            self._neighbor_cells = {
+                divmod(index, width): tuple(divmod(n, width) for n in neighbors)
+                for index, neighbors in enumerate(self.neighbor_indices)
+            }
+        return self._neighbor_cells
+
+    def neighbors(self, compact):
+        """
+        Return the neighbor table for a cell representation.
+
+        Args:
+            compact: True for flat indices, False for (i, j) tuples
+
+        Returns:
+            Table that maps a cell to a tuple of its neighbors when indexed
+        """
+        return self.neighbor_indices if compact else self.neighbor_cells
+
+    def index(self, cell):
+        """Flat index of an (i, j) cell."""
+        return cell[0] * self.width + cell[1]
+
+    def cell(self, index):
+        """(i, j) cell at a flat index."""
+        return divmod(index, self.width)
@@ -0,0 +1,196 @@
+"""
+Minesweeper Linear Inference
+Gaussian elimination over the frontier constraints, kept reduced as the game goes on.
+"""
+
+from fractions import Fraction
+
+
+class LinearSystem:
+    """
+    The knowledge base as a system of linear equations over 0/1 cells.
+
+    Every sentence {cells} = count is the equation sum(cells) = count. The
+    system is kept in reduced row echelon form with exact rational
+    coefficients: each row has a pivot cell that appears in no other row.
+    Rows are sparse (cell -> coefficient), and an index from each cell to
+    the rows containing it lets known cells be substituted and new
+    equations be reduced without touching unrelated rows.
+
+    A row pins its cells when its right-hand side equals the smallest or
+    largest value the left-hand side can take with 0/1 cells: e.g. the
+    1-2-1 pattern reduces to rows like x1 - x3 = 1, forcing x1 = 1 and
+    x3 = 0, which subset inference cannot see because neither sentence
+    contains the other.
+    """
+
+    def __init__(self):
+        """Create an empty system."""
+        # Rows by pivot cell: (coefficients by cell, right-hand side)
+        self.rows = {}
+
+        # Pivots of the rows that contain each cell
+        self.cell_rows = {}
+
+        # Pivots of rows changed since forced() last looked at them
+        self._dirty = set()
+
+    @classmethod
+    def from_sentences(cls, sentences):
+        """
+        Build a reduced system from sentences.
+
+        Args:
+            sentences: Iterable of sentences with cells and count
+        """
+        system = cls()
+        for sentence in sentences:
+            system.add_equation(sentence.cells, sentence.count)
+        return system
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _link(self, pivot, coefficients):
+        """
+        Index a row under each of its cells.
+        """
+        for cell in coefficients:
+            self.cell_rows.setdefault(cell, set()).add(pivot)
+
+    def _unlink(self, pivot, cell):
+        """
+        Remove one cell of a row from the index.
+        """
+        pivots = self.cell_rows[cell]
+        pivots.discard(pivot)
+        if not pivots:
+            del self.cell_rows[cell]
+
+    def _reduce(self, coefficients, rhs):
+        """
+        Eliminate every pivot cell from an equation.
+
+        Args:
+            coefficients: Dictionary of coefficients by cell, changed in place
+            rhs: Right-hand side
+
+        Returns:
+            The new right-hand side
+        """
+        for cell in [cell for cell in coefficients if cell in self.rows]:
+            factor = coefficients.pop(cell)
+            row, row_rhs = self.rows[cell]
+            for other, value in row.items():
+                if other == cell:
+                    continue
+                total = coefficients.get(other, 0) - factor * value
+                if total:
+                    coefficients[other] = total
+                else:
+                    coefficients.pop(other, None)
+            rhs -= factor * row_rhs
+        return rhs
+
+    def _insert(self, coefficients, rhs):
+        """
+        Add an already reduced, non-empty equation as a new pivot row and
+        eliminate its pivot from the other rows.
+        """
+        pivot = next(iter(coefficients))
+        scale = coefficients[pivot]
+        if scale != 1:
+            coefficients = {cell: value / scale for cell, value in coefficients.items()}
+            rhs = rhs / scale
+
+        # Eliminate the new pivot from every row that contains it
+        for other in list(self.cell_rows.get(pivot, ())):
+            row, row_rhs = self.rows[other]
+            factor = row.pop(pivot)
+            self._unlink(other, pivot)
+            for cell, value in coefficients.items():
+                if cell == pivot:
+                    continue
+                total = row.get(cell, 0) - factor * value
+                if total:
+                    if cell not in row:
+                        self.cell_rows.setdefault(cell, set()).add(other)
+                    row[cell] = total
+                elif cell in row:
+                    del row[cell]
+                    self._unlink(other, cell)
+            self.rows[other] = (row, row_rhs - factor * rhs)
+            self._dirty.add(other)
+
+        self.rows[pivot] = (coefficients, rhs)
+        self._link(pivot, coefficients)
+        self._dirty.add(pivot)
+
+    def add_equation(self, cells, count):
+        """
+        Add the equation sum(cells) = count.
+
+        Equations that follow from the existing rows reduce to nothing and
+        are dropped.
+
+        Args:
+            cells: Iterable of unknown cells
+            count: Number of mines among them
+        """
+        coefficients = {cell: Fraction(1) for cell in cells}
+        rhs = self._reduce(coefficients, Fraction(count))
+        if coefficients:
+            self._insert(coefficients, rhs)
+
+    def assign(self, cell, value):
+        """
+        Substitute a known value for a cell.
+
+        Args:
+            cell: Cell that became known
+            value: 1 for a mine, 0 for a safe cell
+        """
+        pivots = self.cell_rows.pop(cell, None)
+        if not pivots:
+            return
+
+        for pivot in pivots:
+            row, rhs = self.rows[pivot]
+            rhs -= row.pop(cell) * value
+            self.rows[pivot] = (row, rhs)
+            self._dirty.add(pivot)
+
+        # A row that lost its pivot is reduced again with a new one
+        if cell in self.rows:
+            row, rhs = self.rows.pop(cell)
+            self._dirty.discard(cell)
+            for other in row:
+                self._unlink(cell, other)
+            if row:
+                self._insert(row, rhs)
+
+    def forced(self):
+        """
+        Find cells pinned by the rows changed since the last call.
+
+        Returns:
+            Tuple (safes, mines) of sets of cells
+        """
+        safes = set()
+        mines = set()
+        for pivot in self._dirty:
+            entry = self.rows.get(pivot)
+            if entry is None:
+                continue
+            row, rhs = entry
+            low = sum(value for value in row.values() if value < 0)
+            high = sum(value for value in row.values() if value > 0)
+            if rhs == low:
+                # Every positive cell is 0 and every negative cell is 1
+                for cell, value in row.items():
+                    (safes if value > 0 else mines).add(cell)
+            elif rhs == high:
+                for cell, value in row.items():
+                    (mines if value > 0 else safes).add(cell)
+        self._dirty.clear()
+        return safes, mines
@@ -0,0 +1,167 @@
+"""
+Minesweeper Server Load Generator
+Plays many concurrent AI-driven games against server.py and reports throughput and latency.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from profiling import PERCENTILES, percentile
+from server import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE
+
+
+class LoadClient:
+    """
+    One connection to the server, timing every request it sends.
+    """
+
+    def __init__(self, reader, writer, latencies):
+        """
+        Wrap an open connection.
+
+        Args:
+            reader: asyncio StreamReader of the connection
+            writer: asyncio StreamWriter of the connection
+            latencies: List that the time of each request is appended to
+        """
+        self.reader = reader
+        self.writer = writer
+        self.latencies = latencies
+
+    @classmethod
+    async def connect(cls, host, port, latencies):
+        """
+        Open a connection to the server.
+        """
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer, latencies)
+
+    async def request(self, **request):
+        """
+        Send one request and wait for its response.
+
+        Raises:
+            RuntimeError: If the server reports an error
+        """
+        start = time.perf_counter()
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        self.latencies.append(time.perf_counter() - start)
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response
+
+    async def play_game(self, height, width, mines, seed):
+        """
+        Play one game by always taking the server AI's suggestion.
+
+        Returns:
+            True if the game was won
+        """
+        session = (await self.request(op='new', height=height, width=width,
+                                      mines=mines, seed=seed))['session']
+        won = False
+        try:
+            while True:
+                cell = (await self.request(op='suggest', session=session))['cell']
+                if cell is None:
+                    break
+                result = await self.request(op='reveal', session=session, cell=cell)
+                if result['mine'] or result['won']:
+                    won = result['won']
+                    break
+        finally:
+            await self.request(op='close', session=session)
+        return won
+
+    async def close(self):
+        """
+        Close the connection.
+        """
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(host, port, clients, games, height, width, mines, seed=None):
+    """
+    Play games over several concurrent connections.
+
+    Args:
+        host: Server address
+        port: Server port
+        clients: Number of concurrent connections
+        games: Games played by each connection
+        height: Board height
+        width: Board width
+        mines: Number of mines
+        seed: Master seed for the boards, or None
+
+    Returns:
+        Dictionary with sessions, wins, requests, elapsed seconds,
+        sessions_per_sec, requests_per_sec and latency percentiles in seconds
+    """
+    master = random.Random(seed)
+    latencies = []
+    wins = 0
+
+    async def client_loop(seeds):
+        nonlocal wins
+        client = await LoadClient.connect(host, port, latencies)
+        try:
+            for game_seed in seeds:
+                if await client.play_game(height, width, mines, game_seed):
+                    wins += 1
+        finally:
+            await client.close()
+
+    plans = [[master.getrandbits(64) for _ in range(games)] for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(seeds) for seeds in plans))
+    elapsed = time.perf_counter() - start
+
+    sessions = clients * games
+    report = {
+        'sessions': sessions,
+        'wins': wins,
+        'requests': len(latencies),
+        'elapsed': elapsed,
+        'sessions_per_sec': sessions / elapsed,
+        'requests_per_sec': len(latencies) / elapsed,
+    }
+    ordered = sorted(latencies)
+    for q in PERCENTILES:
+        report[f'p{q}'] = percentile(ordered, q) if ordered else 0.0
+    return report
+
+
+def main():
+    """Run the load generator from the command line."""
+    parser = argparse.ArgumentParser(description="Load-test the Minesweeper game server.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="server address")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument('--clients', type=int, default=16, help="concurrent connections")
+    parser.add_argument('--games', type=int, default=20, help="games per connection")
+    parser.add_argument('--height', type=int, default=16, help="board height")
+    parser.add_argument('--width', type=int, default=16, help="board width")
+    parser.add_argument('--mines', type=int, default=40, help="number of mines")
+    parser.add_argument('--seed', type=int, default=None, help="master seed for the boards")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.host, args.port, args.clients, args.games,
+                                  args.height, args.width, args.mines, args.seed))
+
+    print(f"Sessions:      {report['sessions']} ({report['wins']} won)")
+    print(f"Requests:      {report['requests']}")
+    print(f"Elapsed:       {report['elapsed']:.2f}s")
+    print(f"Sessions/sec:  {report['sessions_per_sec']:.1f}")
+    print(f"Requests/sec:  {report['requests_per_sec']:.1f}")
+    print("Latency (ms):  " + "  ".join(
+        f"p{q} {report[f'p{q}'] * 1000:.2f}" for q in PERCENTILES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Minesweeper Guess Lookahead
+Chooses between near-equally risky guesses by how much each reveal is expected to teach.
+"""
+
+import math
+from collections import OrderedDict
+
+from probability import BudgetExceeded, log_solution_weight
+
+
+class TranspositionTable:
+    """
+    Bounded memo of evaluated positions, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries=10000):
+        """
+        Create an empty table.
+
+        Args:
+            max_entries: Number of positions kept
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Look up a position, marking it as recently used.
+
+        Returns:
+            The stored value, or None
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Store a position, evicting the oldest one if the table is full.
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class Lookahead:
+    """
+    Guess selection that looks at what each candidate reveal could teach.
+
+    Only cells whose mine probability is within tolerance of the safest
+    cell are considered, so lookahead never trades much safety for
+    information. For each candidate, every count it could show is tried on
+    a hypothetical copy of the agent's knowledge (MinesweeperAI.hypothetical),
+    weighted by its exact likelihood, and scored by the number of safe
+    cells the agent could then deduce. With depth > 1, outcomes that teach
+    nothing are followed by the best next guess, so the score becomes the
+    expected number of safe cells found within depth guesses without
+    hitting a mine.
+
+    Positions already evaluated are remembered in a transposition table
+    keyed by the knowledge base itself (a frozenset of immutable
+    sentences), so the same frontier reached by a different route is not
+    searched twice. Each guess may expand at most node_budget hypothetical
+    reveals; when the budget runs out the best candidate found so far is
+    used. Weighing a reveal enumerates the frontier, and if any component
+    needs more than component_budget search nodes the agent falls back to
+    its ordinary choice, so the latency of a guess stays bounded.
+    """
+
+    def __init__(self, depth=1, tolerance=0.05, max_candidates=6, node_budget=300,
+                 component_budget=20000, table_size=10000):
+        """
+        Configure the lookahead.
+
+        Args:
+            depth: Number of consecutive guesses looked ahead
+            tolerance: How much riskier than the safest cell a candidate may be
+            max_candidates: Candidates evaluated per position, safest first
+            node_budget: Hypothetical reveals allowed per guess
+            component_budget: Search nodes allowed per frontier component
+                when weighing a reveal
+            table_size: Positions kept in the transposition table
+        """
+        self.depth = depth
+        self.tolerance = tolerance
+        self.max_candidates = max_candidates
+        self.node_budget = node_budget
+        self.component_budget = component_budget
+        self.table = TranspositionTable(table_size)
+        self._nodes = 0
+
+    def choose(self, ai, probabilities, outside, unconstrained):
+        """
+        Pick a guess for an agent that has no safe move.
+
+        Args:
+            ai: MinesweeperAI to choose for; its knowledge is left unchanged
+            probabilities: Frontier cell mine probabilities
+            outside: Mine probability of unconstrained cells, or None
+            unconstrained: Number of unconstrained cells
+
+        Returns:
+            The chosen cell, or None to use the agent's ordinary choice
+        """
+        self._nodes = 0
+        try:
+            value, cell = self._best(ai, self.depth, probabilities, outside, unconstrained)
+        except BudgetExceeded:
+            return None
+        return cell
+
+    def _position_key(self, ai, depth):
+        """
+        Canonical key of the agent's position: the sentences, plus the
+        counts that fix the mine and unconstrained totals.
+        """
+        return (frozenset(ai.knowledge), len(ai.mines), ai.unknown_count(),
+                len(ai.pending_safe_moves()), depth)
+
+    def _candidates(self, ai, probabilities, outside, unconstrained):
+        """
+        Cells worth evaluating, as (cell, mine probability) pairs, safest first.
+        """
+        options = sorted(probabilities.items(), key=lambda item: item[1])
+        if outside is not None and unconstrained:
+            options.append((ai.random_unconstrained(unconstrained), outside))
+            options.sort(key=lambda item: item[1])
+        if not options:
+            return []
+        limit = options[0][1] + self.tolerance
+        return [(cell, prob) for cell, prob in options if prob <= limit][:self.max_candidates]
+
+    def _best(self, ai, depth, probabilities, outside, unconstrained):
+        """
+        Evaluate the candidates of a position.
+
+        Returns:
+            Tuple (value, cell) of the best candidate, where value is the
+            expected number of safe cells it leads to
+        """
+        key = self._position_key(ai, depth)
+        stored = self.table.get(key)
+        if stored is not None and ai.is_unknown(stored[1]):
+            return stored
+
+        best = (-1.0, None)
+        complete = True
+        for cell, prob in self._candidates(ai, probabilities, outside, unconstrained):
+            if self._nodes >= self.node_budget:
+                complete = False
+                break
+            value = (1 - prob) * self._expected_gain(ai, cell, depth)
+            if value > best[0]:
+                best = (value, cell)
+
+        if complete and best[1] is not None:
+            self.table.put(key, best)
+        return best
+
+    def _expected_gain(self, ai, cell, depth):
+        """
+        Expected number of safe cells deduced after revealing a cell,
+        given that it is safe.
+        """
+        neighbors = ai.neighbors(cell)
+        known_mines = sum(1 for neighbor in neighbors if neighbor in ai.mines)
+        unknown = sum(1 for neighbor in neighbors
+                      if neighbor not in ai.mines and neighbor not in ai.safes)
+
+        outcomes = []
+        for extra in range(unknown + 1):
+            self._nodes += 1
+            with ai.hypothetical():
+                ai.record_observations([(cell, known_mines + extra)])
+                weight = log_solution_weight(ai.knowledge, ai.unconstrained_count(),
+                                             ai.mines_left(), self.component_budget)
+                if weight is None:
+                    continue
+                ai.infer_knowledge()
+                gain = len(ai.pending_safe_moves())
+                if gain == 0 and depth > 1 and ai.unknown_count():
+                    unconstrained = ai.unconstrained_count()
+                    probabilities, outside = ai.mine_probabilities(unconstrained)
+                    gain = max(0.0, self._best(ai, depth - 1, probabilities,
+                                               outside, unconstrained)[0])
+            outcomes.append((weight, gain))
+
+        if not outcomes:
+            return 0.0
+        top = max(weight for weight, gain in outcomes)
+        weights = [math.exp(weight - top) for weight, gain in outcomes]
+        return sum(w * gain for w, (weight, gain) in zip(weights, outcomes)) / sum(weights)
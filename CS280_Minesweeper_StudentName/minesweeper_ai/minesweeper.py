@@ -5,13 +5,30 @@ Implements the game board, mine placement, and move validation.
 
 import random
 
+from geometry import BoardGeometry
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; pure Python is used without it
+    np = None
+
+# Boards with at least this many cells place their mines with NumPy when available
+NUMPY_PLACEMENT_CELLS = 65536
+
 
 class Minesweeper:
     """
     Minesweeper game representation
+    
+    Cells are (i, j) tuples, or flat integer indices i * width + j when the
+    game is created in compact mode. Compact mode avoids building and hashing
+    tuples in tight game loops; to_index and to_cell convert between the two.
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    __slots__ = ('height', 'width', 'compact', 'geometry', 'mask', 'counts',
+                 'mines_found', 'revealed', '_mines')
+
+    def __init__(self, height=8, width=8, mines=8, compact=False, rng=None, layout=None):
         """
         Initialize game board with given dimensions and number of mines.
         
@@ -19,30 +36,131 @@ class Minesweeper:
             height: Number of rows
             width: Number of columns
             mines: Number of mines to place
+            compact: Use flat integer indices for cells instead of tuples
+            rng: random.Random instance used to place mines (default: the
+                random module's shared generator)
+            layout: Flat indices of the mines to use instead of placing them
+                randomly, e.g. to replay a stored board; mines is then ignored
         """
         # Set initial dimensions
         self.height = height
         self.width = width
-        self.mines = set()
+        self.compact = compact
 
-        # Initialize empty board (all False)
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) < mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
-
-        # Track cells that have been revealed
+        # Neighbor tables shared with every game of the same size
+        self.geometry = BoardGeometry.get(height, width)
+
+        # Add mines randomly: one mask byte per cell, row-major by flat index
+        if layout is not None:
+            mine_indices = list(layout)
+            self.mask = bytearray(height * width)
+            for index in mine_indices:
+                self.mask[index] = 1
+        else:
+            mine_indices = self._place_mines(mines, rng if rng is not None else random)
+
+        # Count the neighboring mines of every cell once, row-major by flat index
+        self.counts = self._count_nearby_mines(mine_indices)
+
+        # The set of mine cells is only built if someone asks for it
+        self._mines = None
+
+        # Track mines that have been found and cells that have been revealed
         self.mines_found = set()
+        self.revealed = set()
+
+    def _place_mines(self, mines, rng):
+        """
+        Choose mine positions by sampling cells without replacement and store
+        them in self.mask.
+        
+        Large boards use NumPy when it is available, seeded from rng so that
+        the same seed still reproduces the board.
+        
+        Args:
+            mines: Number of mines to place
+            rng: Random number generator to sample with
+            
+        Returns:
+            Flat indices of the mines
+        """
+        size = self.height * self.width
+        if np is not None and size >= NUMPY_PLACEMENT_CELLS:
+            generator = np.random.default_rng(rng.getrandbits(64))
+            mine_indices = generator.choice(size, mines, replace=False)
+            mask = np.zeros(size, dtype=np.uint8)
+            mask[mine_indices] = 1
+            self.mask = bytearray(mask.tobytes())
+            return mine_indices
+
+        mine_indices = rng.sample(range(size), mines)
+        self.mask = bytearray(size)
+        for index in mine_indices:
+            self.mask[index] = 1
+        return mine_indices
+
+    def _count_nearby_mines(self, mine_indices):
+        """
+        Compute the number of neighboring mines for every cell.
+        
+        With NumPy the 3x3 neighborhood sum is done on the whole mine mask at
+        once; otherwise each mine increments the counts of its neighbors.
+        
+        Args:
+            mine_indices: Flat indices of the mines
+            
+        Returns:
+            Bytearray of counts indexed by flat index i * width + j
+        """
+        if np is not None:
+            padded = np.zeros((self.height + 2, self.width + 2), dtype=np.uint8)
+            padded[1:-1, 1:-1] = np.frombuffer(self.mask, dtype=np.uint8).reshape(
+                self.height, self.width)
+            counts = np.zeros((self.height, self.width), dtype=np.uint8)
+            for di in range(3):
+                for dj in range(3):
+                    if di != 1 or dj != 1:
+                        counts += padded[di:di + self.height, dj:dj + self.width]
+            return bytearray(counts.tobytes())
+
+        counts = bytearray(self.height * self.width)
+        neighbor_indices = self.geometry.neighbor_indices
+        for mine in mine_indices:
+            for neighbor in neighbor_indices[mine]:
+                counts[neighbor] += 1
+        return counts
+
+    @property
+    def mines(self):
+        """
+        Set of cells containing mines, built from the mask on first access.
+        """
+        if self._mines is None:
+            indices = [index for index, flag in enumerate(self.mask) if flag]
+            if self.compact:
+                self._mines = set(indices)
+            else:
+                self._mines = set(map(self.geometry.cell, indices))
+        return self._mines
+
+    @property
+    def board(self):
+        """
+        Board as a list of rows of booleans, True where there is a mine.
+        """
+        width = self.width
+        return [[bool(flag) for flag in self.mask[i * width:(i + 1) * width]]
+                for i in range(self.height)]
+
+    def count_grid(self):
+        """
+        Return the nearby-mine count of every cell as a list of rows.
+        
+        Renderers and batch code can read counts from this (or from the flat
+        counts bytearray) without calling nearby_mines per cell.
+        """
+        width = self.width
+        return [list(self.counts[i * width:(i + 1) * width]) for i in range(self.height)]
 
     def print(self):
         """
@@ -52,52 +170,94 @@ class Minesweeper:
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.mask[i * self.width + j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
             print("|")
         print("--" * self.width + "-")
 
+    def to_index(self, cell):
+        """
+        Convert an (i, j) cell to its flat index i * width + j.
+        
+        Args:
+            cell: Tuple (i, j) representing cell coordinates
+        """
+        return self.geometry.index(cell)
+
+    def to_cell(self, index):
+        """
+        Convert a flat index back to an (i, j) cell.
+        
+        Args:
+            index: Flat cell index
+        """
+        return self.geometry.cell(index)
+
     def is_mine(self, cell):
         """
         Check if a cell contains a mine.
         
         Args:
-            cell: Tuple (i, j) representing cell coordinates
+            cell: Tuple (i, j), or flat index in compact mode
             
         Returns:
             True if cell contains a mine, False otherwise
         """
-        i, j = cell
-        return self.board[i][j]
+        if self.compact:
+            return self.mask[cell] == 1
+        return self.mask[cell[0] * self.width + cell[1]] == 1
 
     def nearby_mines(self, cell):
         """
         Count the number of mines in adjacent cells (including diagonals).
         
         Args:
-            cell: Tuple (i, j) representing cell coordinates
+            cell: Tuple (i, j), or flat index in compact mode
             
         Returns:
             Integer count of nearby mines (0-8)
         """
-        count = 0
+        if self.compact:
+            return self.counts[cell]
+        return self.counts[cell[0] * self.width + cell[1]]
 
-        # Check all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
+    def reveal(self, cell):
+        """
+        Reveal a safe cell, flood-filling outwards from cells with no nearby
+        mines the way the classic game does.
+        
+        Every neighbor of a zero cell is safe, so it is revealed too, and the
+        fill continues from any of those that are also zero.
+        
+        Args:
+            cell: Cell to reveal, which must not be a mine (check is_mine first)
+            
+        Returns:
+            List of (cell, nearby mine count) pairs for every newly revealed
+            cell, starting with the given one; empty if it was already revealed
+        """
+        if cell in self.revealed:
+            return []
 
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
+        neighbors = self.geometry.neighbors(self.compact)
+        self.revealed.add(cell)
+        count = self.nearby_mines(cell)
+        revealed = [(cell, count)]
 
-                # Check if cell is valid and contains a mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        # Cells with no nearby mines whose neighbors still need revealing
+        zeros = [cell] if count == 0 else []
+        while zeros:
+            for neighbor in neighbors[zeros.pop()]:
+                if neighbor not in self.revealed:
+                    self.revealed.add(neighbor)
+                    count = self.nearby_mines(neighbor)
+                    revealed.append((neighbor, count))
+                    if count == 0:
+                        zeros.append(neighbor)
 
-        return count
+        return revealed
 
     def won(self):
         """
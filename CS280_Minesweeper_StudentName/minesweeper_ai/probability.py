@@ -0,0 +1,413 @@
+"""
+Minesweeper Probability Engine
+Computes exact mine probabilities for frontier cells from the AI's knowledge base.
+"""
+
+import math
+
+# Search nodes allowed per component before falling back to an estimate
+COMPONENT_NODE_BUDGET = 200000
+
+# Components with more cells than this are always estimated
+MAX_COMPONENT_CELLS = 500
+
+
+class BudgetExceeded(Exception):
+    """Raised when enumerating a component needs more nodes than allowed."""
+
+
+def frontier_probabilities(sentences, unconstrained, mines_left=None,
+                           node_budget=COMPONENT_NODE_BUDGET):
+    """
+    Compute the probability that each frontier cell is a mine.
+
+    The frontier (cells appearing in at least one sentence) is split into
+    independent components: cells are connected when they share a sentence.
+    Each component's consistent mine assignments are enumerated separately,
+    counting solutions by how many mines they use, so components are never
+    combined by enumerating their cross product. The components are then
+    combined with the cells outside the frontier by a convolution over
+    component mine totals, weighting each total by the number of ways to
+    place the remaining mines among the unconstrained cells.
+
+    Args:
+        sentences: Iterable of sentences with cells and count
+        unconstrained: Number of unknown cells not in any sentence
+        mines_left: Mines not yet identified, or None if the total is unknown;
+            mines expected in estimated components are taken off it
+        node_budget: Search nodes allowed per component
+
+    Returns:
+        Tuple (probabilities, outside) where probabilities maps each frontier
+        cell to its mine probability and outside is the probability for any
+        unconstrained cell, or None if it cannot be computed
+    """
+    components = _split_components(sentences)
+
+    # Enumerate each component on its own; components that are too large to
+    # enumerate get an estimate and are left out of the global weighting,
+    # apart from the mines they are expected to hold
+    solved = []
+    probabilities = {}
+    estimated_mines = 0
+    for cells, component_sentences in components:
+        try:
+            solved.append(_scale_component(
+                *_enumerate_component(cells, component_sentences, node_budget)))
+        except BudgetExceeded:
+            estimates = _estimate_component(component_sentences)
+            probabilities.update(estimates)
+            estimated_mines += sum(estimates.values())
+
+    if mines_left is not None:
+        mines_left -= estimated_mines
+
+    if mines_left is None:
+        for order, ways, cell_ways in solved:
+            probabilities.update(_component_marginals(order, ways, cell_ways))
+        return probabilities, None
+
+    # Relative number of ways to place the rest of the mines outside the
+    # frontier, for every possible number of frontier mines
+    total_frontier = sum(len(ways) - 1 for order, ways, cell_ways in solved)
+    outside_weights = [
+        _placement_weight(unconstrained, mines_left - mines)
+        for mines in range(total_frontier + 1)
+    ]
+    outside_weights = _normalize(outside_weights)
+
+    # Solution counts by mine total of all components except each one
+    polynomials = [ways for order, ways, cell_ways in solved]
+    others = _leave_one_out(polynomials)
+
+    frontier_ways = _convolve_all(polynomials)
+    total = _combine(frontier_ways, outside_weights)
+    if total <= 0:
+        # The knowledge is inconsistent with the mine count (e.g. a wrong
+        # flag); treat the total as unknown rather than divide by zero
+        for order, ways, cell_ways in solved:
+            probabilities.update(_component_marginals(order, ways, cell_ways))
+        return probabilities, None
+
+    for (order, ways, cell_ways), rest in zip(solved, others):
+        # Weight of each mine count in this component given everything else
+        weights = [
+            _combine(rest, outside_weights, shift=mines)
+            for mines in range(len(ways))
+        ]
+        for cell, by_mines in zip(order, cell_ways):
+            mine_weight = sum(count * weight for count, weight in zip(by_mines, weights))
+            probabilities[cell] = mine_weight / total
+
+    outside = None
+    if unconstrained > 0:
+        # Expected number of mines outside the frontier, spread evenly
+        expected = sum(
+            count * weight * (mines_left - mines)
+            for mines, (count, weight) in enumerate(zip(frontier_ways, outside_weights))
+        )
+        outside = expected / total / unconstrained
+
+    return probabilities, outside
+
+
+def log_solution_weight(sentences, unconstrained, mines_left=None,
+                        node_budget=COMPONENT_NODE_BUDGET):
+    """
+    Natural log of the number of mine arrangements consistent with the
+    sentences, counting the placements of the remaining mines among the
+    unconstrained cells when the mine total is known.
+
+    Comparing the weights of two sets of sentences over the same cells
+    gives their relative likelihood, e.g. of the different counts a cell
+    could reveal.
+
+    Args:
+        sentences: Iterable of sentences with cells and count
+        unconstrained: Number of unknown cells not in any sentence
+        mines_left: Mines not yet identified, or None if the total is unknown
+        node_budget: Search nodes allowed per component
+
+    Returns:
+        The log weight, or None if no arrangement is consistent
+
+    Raises:
+        BudgetExceeded: If a component is too large to enumerate
+    """
+    polynomials = [
+        _enumerate_component(cells, component_sentences, node_budget)[1]
+        for cells, component_sentences in _split_components(sentences)
+    ]
+    frontier_ways = _convolve_all(polynomials)
+
+    terms = []
+    for mines, count in enumerate(frontier_ways):
+        if not count:
+            continue
+        if mines_left is None:
+            terms.append(math.log(count))
+        else:
+            placement = _placement_weight(unconstrained, mines_left - mines)
+            if placement is not None:
+                terms.append(math.log(count) + placement)
+    if not terms:
+        return None
+    top = max(terms)
+    return top + math.log(sum(math.exp(term - top) for term in terms))
+
+
+def _split_components(sentences):
+    """
+    Group sentences into independent components of connected cells.
+
+    Returns:
+        List of (cells, sentences) pairs, one per component
+    """
+    parent = {}
+
+    def find(cell):
+        root = cell
+        while parent[root] != root:
+            root = parent[root]
+        while parent[cell] != root:
+            parent[cell], cell = root, parent[cell]
+        return root
+
+    sentences = [sentence for sentence in sentences if len(sentence) > 0]
+    for sentence in sentences:
+        cells = iter(sentence.cells)
+        first = next(cells)
+        parent.setdefault(first, first)
+        root = find(first)
+        for cell in cells:
+            if cell not in parent:
+                parent[cell] = root
+            else:
+                other = find(cell)
+                if other != root:
+                    parent[other] = root
+
+    groups = {}
+    for cell in parent:
+        groups.setdefault(find(cell), ([], []))[0].append(cell)
+    for sentence in sentences:
+        groups[find(next(iter(sentence.cells)))][1].append(sentence)
+    return list(groups.values())
+
+
+def _enumerate_component(cells, sentences, node_budget):
+    """
+    Enumerate every consistent mine assignment of one component.
+
+    Cells that appear in exactly the same sentences are interchangeable, so
+    they are assigned as a group: the search picks how many of a group's
+    cells are mines and counts every choice of those cells at once, with a
+    binomial coefficient. Groups are assigned in breadth-first order of
+    their cells through shared sentences so constraints close early, and
+    only mine counts that keep every sentence satisfiable are tried.
+
+    Returns:
+        Tuple (order, ways, cell_ways): the cells in assignment order,
+        ways[m] = number of solutions with m mines, and cell_ways[k][m] =
+        number of those solutions in which cell order[k] is a mine
+    """
+    if len(cells) > MAX_COMPONENT_CELLS:
+        raise BudgetExceeded()
+
+    order = _assignment_order(cells, sentences)
+
+    # Group the cells by the sentences they are in
+    membership = {cell: [] for cell in order}
+    for index, sentence in enumerate(sentences):
+        for cell in sentence.cells:
+            membership[cell].append(index)
+    groups = {}
+    for cell in order:
+        groups.setdefault(tuple(membership[cell]), []).append(cell)
+    constraints = list(groups)
+    sizes = [len(members) for members in groups.values()]
+    binomials = [[math.comb(size, mines) for mines in range(size + 1)] for size in sizes]
+
+    # Remaining mines needed and unassigned cells for each sentence
+    need = [sentence.count for sentence in sentences]
+    left = [len(sentence) for sentence in sentences]
+
+    total_cells = len(order)
+    ways = [0] * (total_cells + 1)
+    # Solutions by mine total, each counted once per mine in the group
+    group_ways = [[0] * (total_cells + 1) for _ in sizes]
+    chosen = []
+    nodes = 0
+
+    def search(k, mines, weight):
+        nonlocal nodes
+        nodes += 1
+        if nodes > node_budget:
+            raise BudgetExceeded()
+
+        if k == len(sizes):
+            ways[mines] += weight
+            for group, value in enumerate(chosen):
+                if value:
+                    group_ways[group][mines] += weight * value
+            return
+
+        indices = constraints[k]
+        size = sizes[k]
+        for index in indices:
+            left[index] -= size
+        low = max(0, max(need[index] - left[index] for index in indices))
+        high = min(size, min(need[index] for index in indices))
+        for value in range(low, high + 1):
+            for index in indices:
+                need[index] -= value
+            chosen.append(value)
+            search(k + 1, mines + value, weight * binomials[k][value])
+            chosen.pop()
+            for index in indices:
+                need[index] += value
+        for index in indices:
+            left[index] += size
+
+    search(0, 0, 1)
+
+    # Each cell of a group is a mine in its share of the group's mines;
+    # the division is exact because C(s, v) * v = s * C(s - 1, v - 1)
+    top = max((m for m, count in enumerate(ways) if count), default=0)
+    by_group = {}
+    for key, size, counts in zip(constraints, sizes, group_ways):
+        by_group[key] = [count // size for count in counts[:top + 1]]
+    return order, ways[:top + 1], [by_group[tuple(membership[cell])] for cell in order]
+
+
+def _assignment_order(cells, sentences):
+    """
+    Order cells breadth-first through shared sentences.
+    """
+    neighbors = {cell: set() for cell in cells}
+    for sentence in sentences:
+        for cell in sentence.cells:
+            neighbors[cell].update(sentence.cells)
+
+    order = []
+    seen = set()
+    for start in cells:
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        for cell in queue:
+            order.append(cell)
+            for neighbor in neighbors[cell]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+    return order
+
+
+def _estimate_component(sentences):
+    """
+    Estimate probabilities for a component too large to enumerate, using the
+    highest count / cells ratio among the sentences containing each cell.
+    """
+    estimates = {}
+    for sentence in sentences:
+        prob = sentence.count / len(sentence)
+        for cell in sentence.cells:
+            estimates[cell] = max(estimates.get(cell, 0), prob)
+    return estimates
+
+
+def _scale_component(order, ways, cell_ways):
+    """
+    Divide a component's solution counts by their total, so they become
+    floats that sum to 1. Products over many components then stay in
+    range, where the exact counts would overflow a float.
+    """
+    total = sum(ways)
+    if total == 0:
+        return order, ways, cell_ways
+    return (order, [count / total for count in ways],
+            [[count / total for count in by_mines] for by_mines in cell_ways])
+
+
+def _component_marginals(order, ways, cell_ways):
+    """
+    Probabilities for one component with every solution weighted equally.
+    """
+    total = sum(ways)
+    if total == 0:
+        return {}
+    return {cell: sum(by_mines) / total for cell, by_mines in zip(order, cell_ways)}
+
+
+def _placement_weight(cells, mines):
+    """
+    Natural log of the number of ways to place mines among cells, or None
+    if it is impossible.
+    """
+    if mines < 0 or mines > cells:
+        return None
+    return math.lgamma(cells + 1) - math.lgamma(mines + 1) - math.lgamma(cells - mines + 1)
+
+
+def _normalize(log_weights):
+    """
+    Convert log weights to floats relative to the largest, so the huge
+    binomial coefficients of big boards never overflow.
+    """
+    known = [weight for weight in log_weights if weight is not None]
+    if not known:
+        return [0.0] * len(log_weights)
+    top = max(known)
+    return [0.0 if weight is None else math.exp(weight - top) for weight in log_weights]
+
+
+def _convolve(a, b):
+    """
+    Multiply two polynomials given as coefficient lists.
+    """
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+def _convolve_all(polynomials):
+    """
+    Multiply any number of polynomials.
+    """
+    result = [1]
+    for polynomial in polynomials:
+        result = _convolve(result, polynomial)
+    return result
+
+
+def _leave_one_out(polynomials):
+    """
+    For each polynomial, the product of all the others, using prefix and
+    suffix products so the work stays linear in the number of components.
+    """
+    prefixes = [[1]]
+    for polynomial in polynomials:
+        prefixes.append(_convolve(prefixes[-1], polynomial))
+    suffix = [1]
+    result = [None] * len(polynomials)
+    for index in range(len(polynomials) - 1, -1, -1):
+        result[index] = _convolve(prefixes[index], suffix)
+        suffix = _convolve(suffix, polynomials[index])
+    return result
+
+
+def _combine(polynomial, weights, shift=0):
+    """
+    Weighted sum of a polynomial's coefficients, reading weights from
+    position shift onwards.
+    """
+    return sum(
+        count * weights[mines + shift]
+        for mines, count in enumerate(polynomial)
+        if count and mines + shift < len(weights)
+    )
@@ -0,0 +1,119 @@
+"""
+Minesweeper AI Profiling
+Collects per-phase timings and counters from an instrumented agent.
+"""
+
+import math
+
+# Percentiles reported for every timed phase
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Non-empty list of numbers in increasing order
+        q: Percentile between 0 and 100
+
+    Returns:
+        The smallest value with at least q percent of the values at or below it
+    """
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class PhaseProfiler:
+    """
+    Wall times, call counts and counters recorded by MinesweeperAI.
+
+    Pass one to MinesweeperAI(profiler=...) to enable instrumentation; an
+    agent without a profiler only pays for an `is not None` check per call.
+    Profilers from several games (or processes) can be merged, and report()
+    turns the raw samples into percentiles.
+
+    Timed phases:
+        add_knowledge: each add_knowledge / add_knowledge_many call
+        infer_knowledge: each inference cascade run by add_knowledge
+        make_safe_move, make_random_move: each move request
+
+    Counters:
+        infer_iterations: sentences taken off the inference worklist
+        subset_comparisons: sentence pairs checked for subset inference
+    """
+
+    __slots__ = ('timings', 'counters', 'kb_sizes')
+
+    def __init__(self):
+        """Create an empty profiler."""
+        # Seconds taken by each call, per phase
+        self.timings = {}
+
+        # Totals of counted events, by name
+        self.counters = {}
+
+        # Knowledge base size after each add_knowledge call
+        self.kb_sizes = []
+
+    def record(self, phase, seconds):
+        """
+        Record the wall time of one call.
+
+        Args:
+            phase: Name of the timed phase
+            seconds: Time taken
+        """
+        samples = self.timings.get(phase)
+        if samples is None:
+            samples = self.timings[phase] = []
+        samples.append(seconds)
+
+    def count(self, name, amount=1):
+        """
+        Add to a counter.
+
+        Args:
+            name: Counter name
+            amount: Amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other):
+        """
+        Add another profiler's samples and counters to this one.
+
+        Args:
+            other: PhaseProfiler to merge in
+        """
+        for phase, samples in other.timings.items():
+            self.timings.setdefault(phase, []).extend(samples)
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+        self.kb_sizes.extend(other.kb_sizes)
+
+    def report(self):
+        """
+        Summarize the samples.
+
+        Returns:
+            Dictionary with 'phases' (per phase: calls, total seconds and
+            p50/p95/p99 in seconds), 'counters', and 'kb_size' (the same
+            percentiles plus the maximum, in sentences)
+        """
+        phases = {}
+        for phase, samples in self.timings.items():
+            ordered = sorted(samples)
+            summary = {'calls': len(ordered), 'total': sum(ordered)}
+            for q in PERCENTILES:
+                summary[f'p{q}'] = percentile(ordered, q)
+            phases[phase] = summary
+
+        kb_size = {}
+        if self.kb_sizes:
+            ordered = sorted(self.kb_sizes)
+            for q in PERCENTILES:
+                kb_size[f'p{q}'] = percentile(ordered, q)
+            kb_size['max'] = ordered[-1]
+
+        return {'phases': phases, 'counters': dict(self.counters), 'kb_size': kb_size}
@@ -0,0 +1,177 @@
+"""
+Minesweeper Benchmark Results
+Streams game results to a JSONL file and aggregates them without keeping them in memory.
+"""
+
+import json
+import os
+
+
+class RunningStats:
+    """
+    Running totals of game results, from which the summary statistics of a
+    run are computed without keeping the results themselves.
+    """
+
+    def __init__(self):
+        """Start with no games."""
+        self.games = 0
+        self.wins = 0
+        self.moves = 0
+        self.safe_moves = 0
+        self.random_moves = 0
+        self.revealed = 0
+
+    def add(self, result):
+        """
+        Add one game result.
+
+        Args:
+            result: Dictionary with game statistics, as from run_single_game
+        """
+        self.games += 1
+        if result['won']:
+            self.wins += 1
+        self.moves += result['moves']
+        self.safe_moves += result['safe_moves']
+        self.random_moves += result['random_moves']
+        self.revealed += result['revealed']
+
+    def summary(self, configuration):
+        """
+        Compute the summary statistics of the games added so far.
+
+        Args:
+            configuration: Description of the board configuration
+
+        Returns:
+            Dictionary with aggregated statistics, as from run_multiple_games
+        """
+        games = self.games or 1
+        return {
+            'configuration': configuration,
+            'games_played': self.games,
+            'wins': self.wins,
+            'losses': self.games - self.wins,
+            'win_rate': (self.wins / games) * 100,
+            'avg_moves': self.moves / games,
+            'avg_safe_moves': self.safe_moves / games,
+            'avg_random_moves': self.random_moves / games,
+            'avg_revealed_cells': self.revealed / games,
+            'avg_accuracy': (self.safe_moves / self.moves * 100) if self.moves > 0 else 0
+        }
+
+
+class JsonlResultSink:
+    """
+    Writes game results to a file as they complete, one JSON object per line.
+
+    Each line holds a game result plus the name of the run it belongs to
+    and its index in that run, so a run that was interrupted can be resumed:
+    the games already on file are read back instead of played again. Lines
+    are buffered and written batch_size at a time, so a crash loses at most
+    one batch.
+    """
+
+    def __init__(self, path, batch_size=1000, resume=False):
+        """
+        Open a sink.
+
+        Args:
+            path: JSONL file to write
+            batch_size: Number of results buffered between writes
+            resume: Keep the results already in the file instead of
+                starting a new one
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = []
+
+        if resume and os.path.exists(path):
+            self._drop_partial_line()
+            self._file = open(path, 'a')
+        else:
+            self._file = open(path, 'w')
+
+    def _drop_partial_line(self, chunk_size=1 << 16):
+        """
+        Cut off a last line left half-written by a crash.
+
+        Only the end of the file is read, scanning back a chunk at a time
+        for the last newline.
+
+        Args:
+            chunk_size: Bytes read per step
+        """
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            position = end
+            while position > 0:
+                start = max(position - chunk_size, 0)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                position = start
+            f.truncate(0)
+
+    def completed(self, run):
+        """
+        Read back the results already written for a run.
+
+        Args:
+            run: Name of the run
+
+        Yields:
+            (game index, result) pairs in the order they were written
+        """
+        self.flush()
+        with open(self.path) as f:
+            for line in f:
+                record = json.loads(line)
+                if record.pop('run') == run:
+                    yield record.pop('game'), record
+
+    def write(self, run, game, result):
+        """
+        Add a game result, writing the buffer once it holds batch_size lines.
+
+        Args:
+            run: Name of the run
+            game: Index of the game in the run
+            result: Dictionary with game statistics
+        """
+        record = {'run': run, 'game': game}
+        record.update(result)
+        self._buffer.append(json.dumps(record) + '\n')
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered results to the file.
+        """
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        """
+        Write buffered results and close the file.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
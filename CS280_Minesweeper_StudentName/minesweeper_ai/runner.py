@@ -3,8 +3,11 @@ Minesweeper Game Runner with Pygame Visualization
 Provides interactive GUI for playing Minesweeper and watching the AI agent.
 """
 
+import argparse
 import pygame
+import queue
 import sys
+import threading
 import time
 from minesweeper import Minesweeper
 from ai_agent import MinesweeperAI
@@ -19,7 +22,14 @@ BLUE = (0, 100, 200)
 DARK_GRAY = (100, 100, 100)
 LIGHT_GRAY = (220, 220, 220)
 
-# Game settings
+# Flagged cells when cells are too small for the flag glyph
+FLAG_COLOR = (255, 140, 0)
+
+# Color of each nearby-mine count
+NUMBER_COLORS = [None, BLUE, GREEN, RED, (128, 0, 128),
+                 (255, 140, 0), (0, 128, 128), BLACK, DARK_GRAY]
+
+# Default game settings, which the command line can override
 HEIGHT = 8
 WIDTH = 8
 MINES = 10
@@ -31,270 +41,717 @@ CELL_SPACING = 2
 FLAG_FONT_SIZE = 30
 NUMBER_FONT_SIZE = 28
 INSTRUCTION_FONT_SIZE = 20
+PANEL_HEIGHT = 130
+
+# Viewport: largest board area shown at once, smallest window, and the
+# zoom range (cell sides in pixels); glyphs need cells of MIN_GLYPH_CELL_SIZE
+MAX_VIEW_WIDTH = 1000
+MAX_VIEW_HEIGHT = 700
+MIN_WINDOW_WIDTH = 450
+MIN_WINDOW_HEIGHT = 400
+MIN_CELL_SIZE = 2
+MAX_CELL_SIZE = 80
+MIN_GLYPH_CELL_SIZE = 14
+
+# Zoom factor per mouse wheel step and pixels scrolled per arrow key press
+ZOOM_STEP = 1.25
+SCROLL_STEP = 60
+
+# Most frames per second; the loop sleeps in between
+FPS = 60
+
+# Viewport scroll (dx, dy) of each arrow key
+SCROLL_KEYS = {
+    pygame.K_LEFT: (-SCROLL_STEP, 0),
+    pygame.K_RIGHT: (SCROLL_STEP, 0),
+    pygame.K_UP: (0, -SCROLL_STEP),
+    pygame.K_DOWN: (0, SCROLL_STEP),
+}
+
+# Seconds between AI moves while the AI is playing, and the range the
+# +/- keys can change it within
+AI_MOVE_INTERVAL = 0.3
+MIN_MOVE_INTERVAL = 0.01
+MAX_MOVE_INTERVAL = 5.0
+
+
+def cell_spacing(cell_size):
+    """
+    Gap between cells in pixels, narrower for small cells.
+    """
+    if cell_size >= MIN_GLYPH_CELL_SIZE:
+        return CELL_SPACING
+    return 1 if cell_size >= 4 else 0
+
+
+def board_pixels(cells, cell_size):
+    """
+    Length in pixels of a row or column of cells.
+    """
+    return cells * (cell_size + cell_spacing(cell_size)) - cell_spacing(cell_size)
+
+
+def fit_cell_size(height, width):
+    """
+    Largest cell size up to CELL_SIZE at which the whole board fits in the
+    largest viewport, or MIN_CELL_SIZE if it never does.
+    """
+    cell_size = CELL_SIZE
+    while cell_size > MIN_CELL_SIZE and (board_pixels(width, cell_size) > MAX_VIEW_WIDTH or
+                                         board_pixels(height, cell_size) > MAX_VIEW_HEIGHT):
+        cell_size -= 1
+    return cell_size
+
+
+class AIWorker:
+    """
+    Owns a game and its AI agent and plays on a background thread.
+
+    The GUI never touches the game or the agent directly: it sends requests
+    (reveal, flag, play, interval) through a queue and polls a second queue
+    for what happened, so a slow knowledge update on a large board never
+    blocks drawing or event handling. Requests are handled in order.
+
+    While playing, the worker waits for the next request with a timeout
+    that runs out when the next move is due, so the move rate needs no
+    sleeping and stopping takes effect as soon as the current move is done.
+    The worker does not use pygame, so it can be driven without a display.
+
+    Results are tuples:
+        ('revealed', newly_revealed, summary): cells revealed by a move
+        ('exploded', cell, summary): a mine was revealed; the game is over
+        ('idle', summary): the AI stopped because it has no move left
+    where summary is the agent's get_knowledge_summary().
+    """
+
+    def __init__(self, height, width, mines, move_interval=AI_MOVE_INTERVAL):
+        """
+        Create a game and start the worker thread.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+            mines: Number of mines
+            move_interval: Seconds between AI moves while playing
+        """
+        self.game = Minesweeper(height=height, width=width, mines=mines)
+        self.ai = MinesweeperAI(height=height, width=width, mines=mines)
+        self.move_interval = move_interval
+
+        # Mine cells, fixed for the game, for the GUI's victory check
+        self.mines = frozenset(self.game.mines)
+
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.playing = False
+        self.over = False
+        self.thread = threading.Thread(target=self._run, name="ai-worker", daemon=True)
+        self.thread.start()
+
+    def reveal(self, cell):
+        """Ask for a cell to be revealed."""
+        self.requests.put(('reveal', cell))
+
+    def flag(self, cell):
+        """Tell the agent that a cell is a mine."""
+        self.requests.put(('flag', cell))
+
+    def play(self, playing):
+        """Start or stop continuous AI play."""
+        self.requests.put(('play', playing))
+
+    def set_interval(self, seconds):
+        """Change the time between AI moves."""
+        self.requests.put(('interval', seconds))
+
+    def poll(self):
+        """
+        Collect the results produced since the last call, without waiting.
+
+        Returns:
+            List of result tuples, oldest first
+        """
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def close(self):
+        """
+        Stop the thread once it has finished its current request.
+        """
+        self.requests.put(None)
+        self.thread.join()
+
+    def _run(self):
+        """
+        Handle requests, making a move each time the move timer runs out.
+        """
+        next_move = None
+        while True:
+            timeout = None if next_move is None else max(0.0, next_move - time.monotonic())
+            try:
+                request = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                self._move()
+                next_move = time.monotonic() + self.move_interval if self.playing else None
+                continue
+
+            if request is None:
+                break
+            kind, value = request
+            if kind == 'reveal':
+                self._reveal(value)
+            elif kind == 'flag':
+                self.ai.mark_mine(value)
+            elif kind == 'play':
+                self.playing = value and not self.over
+                next_move = time.monotonic() if self.playing else None
+            elif kind == 'interval':
+                self.move_interval = value
+                if self.playing:
+                    next_move = time.monotonic() + value
+
+    def _move(self):
+        """
+        Make one AI move: a known safe cell if there is one, else a guess.
+        """
+        move = self.ai.make_safe_move()
+        if move is None:
+            # No safe move, make a random move
+            move = self.ai.make_random_move()
+        if move is None:
+            # No moves left
+            self.playing = False
+            self.results.put(('idle', self.ai.get_knowledge_summary()))
+        else:
+            self._reveal(move)
+
+    def _reveal(self, cell):
+        """
+        Reveal a cell and tell the agent what it showed.
+        """
+        if self.over:
+            return
+        if self.game.is_mine(cell):
+            self.over = True
+            self.playing = False
+            self.results.put(('exploded', cell, self.ai.get_knowledge_summary()))
+            return
+        newly_revealed = self.game.reveal(cell)
+        self.ai.add_knowledge_many(newly_revealed)
+        self.results.put(('revealed', newly_revealed, self.ai.get_knowledge_summary()))
+
+
+class BoardView:
+    """
+    Draws the visible part of the board and the control panel, redrawing
+    only what changed.
+
+    The board is shown through a viewport of fixed size that can be
+    scrolled and zoomed, so boards of any size fit in the window and a
+    frame only costs the cells on screen. Every cell sits on a regular
+    grid, so the cell under the mouse and the cells in view are found by
+    arithmetic rather than by testing each cell.
+
+    Glyphs for numbers, flags and mines are rendered once per zoom level,
+    so redrawing a cell is at most two rectangle fills and one blit. At
+    zoom levels too small for glyphs, flags are drawn as a solid color,
+    numbers are left out, and the whole view is one scaled blit of a map
+    with a pixel per cell. Drawing methods return the rectangles they
+    changed, for pygame.display.update.
+    """
+
+    def __init__(self, screen, height, width, cell_size, viewport):
+        """
+        Prepare fonts and the viewport.
+
+        Args:
+            screen: Display surface
+            height: Number of rows
+            width: Number of columns
+            cell_size: Initial side of a cell in pixels
+            viewport: Rect of the window area the board is shown in
+        """
+        self.screen = screen
+        self.height = height
+        self.width = width
+        self.viewport = viewport
+        self.instruction_font = pygame.font.Font(None, INSTRUCTION_FONT_SIZE)
+        self.medium_font = pygame.font.Font(None, 24)
+
+        # Glyph sets by cell size
+        self._glyph_cache = {}
+
+        # One pixel per cell in the color it is drawn, for drawing cells too
+        # small for glyphs in a single scaled blit
+        self.cell_colors = pygame.Surface((width, height))
+        self.cell_colors.fill(GRAY)
+
+        # Board pixel at the viewport's top-left corner
+        self.offset_x = 0
+        self.offset_y = 0
+        self.pitch = None
+        self.set_cell_size(cell_size)
+
+        button_y = viewport.bottom + BOARD_PADDING + 10
+        self.panel = pygame.Rect(0, button_y, screen.get_width(), PANEL_HEIGHT - 10)
+        self.ai_button = pygame.Rect(BOARD_PADDING, button_y, 150, 35)
+        self.reset_button = pygame.Rect(BOARD_PADDING + 160, button_y, 100, 35)
+
+    def set_cell_size(self, cell_size, anchor=None):
+        """
+        Zoom to a cell size, keeping the board point under anchor in place.
+
+        Args:
+            cell_size: New side of a cell in pixels, clamped to the allowed range
+            anchor: Screen position to zoom around (default: viewport center)
+        """
+        cell_size = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, cell_size))
+        if anchor is None:
+            anchor = self.viewport.center
+        old_pitch = self.pitch
+
+        self.cell_size = cell_size
+        self.spacing = cell_spacing(cell_size)
+        self.pitch = cell_size + self.spacing
+        self.glyphs = self._glyphs(cell_size)
+
+        if old_pitch is not None:
+            # Board coordinates under the anchor scale with the pitch
+            ax = anchor[0] - self.viewport.x
+            ay = anchor[1] - self.viewport.y
+            self.offset_x = (self.offset_x + ax) * self.pitch // old_pitch - ax
+            self.offset_y = (self.offset_y + ay) * self.pitch // old_pitch - ay
+        self.scroll(0, 0)
+
+    def scroll(self, dx, dy):
+        """
+        Move the viewport over the board by a number of pixels, staying on it.
+        """
+        board_width = self.width * self.pitch - self.spacing
+        board_height = self.height * self.pitch - self.spacing
+        self.offset_x = max(0, min(board_width - self.viewport.width, self.offset_x + dx))
+        self.offset_y = max(0, min(board_height - self.viewport.height, self.offset_y + dy))
+
+    def _glyphs(self, cell_size):
+        """
+        Glyphs for a cell size: nearby-mine counts by number, plus flag and
+        mine, or None if cells are too small to show them.
+        """
+        if cell_size < MIN_GLYPH_CELL_SIZE:
+            return None
+        glyphs = self._glyph_cache.get(cell_size)
+        if glyphs is None:
+            flag_font = pygame.font.Font(None, cell_size * FLAG_FONT_SIZE // CELL_SIZE)
+            number_font = pygame.font.Font(None, cell_size * NUMBER_FONT_SIZE // CELL_SIZE)
+            glyphs = {count: number_font.render(str(count), True, NUMBER_COLORS[count])
+                      for count in range(1, 9)}
+            glyphs['flag'] = flag_font.render("🚩", True, RED)
+            glyphs['mine'] = flag_font.render("💣", True, BLACK)
+            self._glyph_cache[cell_size] = glyphs
+        return glyphs
+
+    def visible(self):
+        """
+        Rows and columns at least partly inside the viewport.
+
+        Returns:
+            Tuple (rows, columns) of ranges
+        """
+        pitch = self.pitch
+        rows = range(self.offset_y // pitch,
+                     min(self.height, (self.offset_y + self.viewport.height) // pitch + 1))
+        columns = range(self.offset_x // pitch,
+                        min(self.width, (self.offset_x + self.viewport.width) // pitch + 1))
+        return rows, columns
+
+    def cell_rect(self, cell):
+        """
+        Screen rectangle of a cell, which may lie outside the viewport.
+        """
+        i, j = cell
+        return pygame.Rect(self.viewport.x + j * self.pitch - self.offset_x,
+                           self.viewport.y + i * self.pitch - self.offset_y,
+                           self.cell_size, self.cell_size)
+
+    def cell_at(self, pos):
+        """
+        Cell under a screen position, or None if it is not on a cell.
+        """
+        if not self.viewport.collidepoint(pos):
+            return None
+        x = pos[0] - self.viewport.x + self.offset_x
+        y = pos[1] - self.viewport.y + self.offset_y
+        i, dy = divmod(y, self.pitch)
+        j, dx = divmod(x, self.pitch)
+        if dx >= self.cell_size or dy >= self.cell_size:
+            # Between cells
+            return None
+        if i >= self.height or j >= self.width:
+            return None
+        return (i, j)
+
+    def draw_cell(self, cell, revealed, flags, exploded):
+        """
+        Draw one cell, clipped to the viewport.
+
+        Args:
+            cell: Tuple (i, j)
+            revealed: Dictionary of nearby-mine counts of revealed cells
+            flags: Set of flagged cells
+            exploded: Mine cell that ended the game, or None
+
+        Returns:
+            The part of the cell's rectangle inside the viewport, or None
+            if the cell is out of view
+        """
+        if cell == exploded:
+            color, key = RED, 'mine'
+        elif cell in revealed:
+            color, key = LIGHT_GRAY, revealed[cell]
+        elif cell in flags:
+            color, key = GRAY, 'flag'
+        else:
+            color, key = GRAY, None
+
+        # Keep the cell map up to date even for cells out of view
+        i, j = cell
+        self.cell_colors.set_at((j, i), FLAG_COLOR if key == 'flag' else color)
+
+        rect = self.cell_rect(cell)
+        if not rect.colliderect(self.viewport):
+            return None
+
+        glyphs = self.glyphs
+        glyph = None
+        if glyphs is not None:
+            glyph = glyphs.get(key)
+        elif key == 'flag':
+            color = FLAG_COLOR
+
+        screen = self.screen
+        screen.set_clip(self.viewport)
+        pygame.draw.rect(screen, color, rect)
+        if glyphs is not None:
+            pygame.draw.rect(screen, DARK_GRAY, rect, 2)
+        if glyph is not None:
+            screen.blit(glyph, glyph.get_rect(center=rect.center))
+        screen.set_clip(None)
+        return rect.clip(self.viewport)
+
+    def clear(self):
+        """
+        Forget every drawn cell, for a new game.
+        """
+        self.cell_colors.fill(GRAY)
+
+    def draw_board(self, revealed, flags, exploded):
+        """
+        Clear the window and draw every cell in view.
+
+        Cells too small for glyphs are drawn by scaling up the visible part
+        of the cell map, which stays fast however many cells are in view,
+        so the cells changed since they were last drawn must be drawn with
+        draw_cell first.
+        """
+        screen = self.screen
+        screen.fill(BLACK)
+        rows, columns = self.visible()
+        if self.glyphs is not None:
+            for i in rows:
+                for j in columns:
+                    self.draw_cell((i, j), revealed, flags, exploded)
+            return
+        if not rows or not columns:
+            return
+
+        pitch = self.pitch
+        area = pygame.Rect(columns.start, rows.start, len(columns), len(rows))
+        scaled = pygame.transform.scale(self.cell_colors.subsurface(area),
+                                        (len(columns) * pitch, len(rows) * pitch))
+        left = self.viewport.x + columns.start * pitch - self.offset_x
+        top = self.viewport.y + rows.start * pitch - self.offset_y
+
+        screen.set_clip(self.viewport)
+        screen.blit(scaled, (left, top))
+
+        # Cut the gaps between cells
+        if self.spacing:
+            for k in range(1, len(columns) + 1):
+                screen.fill(BLACK, (left + k * pitch - self.spacing, top,
+                                    self.spacing, scaled.get_height()))
+            for k in range(1, len(rows) + 1):
+                screen.fill(BLACK, (left, top + k * pitch - self.spacing,
+                                    scaled.get_width(), self.spacing))
+        screen.set_clip(None)
+
+    def draw_panel(self, ai_playing, status_text, status_color, ai_text):
+        """
+        Draw the buttons and status lines.
+
+        Returns:
+            The panel's rectangle
+        """
+        screen = self.screen
+        center_x = screen.get_width() / 2
+        screen.fill(BLACK, self.panel)
+
+        # AI Move button
+        pygame.draw.rect(screen, RED if ai_playing else GREEN, self.ai_button)
+        label = self.instruction_font.render("Stop AI" if ai_playing else "AI Move", True, WHITE)
+        screen.blit(label, label.get_rect(center=self.ai_button.center))
+
+        # Reset button
+        pygame.draw.rect(screen, DARK_GRAY, self.reset_button)
+        label = self.instruction_font.render("Reset", True, WHITE)
+        screen.blit(label, label.get_rect(center=self.reset_button.center))
+
+        status = self.instruction_font.render(status_text, True, status_color)
+        screen.blit(status, status.get_rect(center=(center_x, self.ai_button.y + 55)))
+
+        ai_status = self.instruction_font.render(ai_text, True, BLUE)
+        screen.blit(ai_status, ai_status.get_rect(center=(center_x, self.ai_button.y + 80)))
+        return self.panel
+
+    def draw_instructions(self):
+        """
+        Draw the start screen.
+        """
+        screen = self.screen
+        center_x = screen.get_width() / 2
+        screen.fill(BLACK)
+
+        title = self.medium_font.render("Play Minesweeper", True, WHITE)
+        screen.blit(title, title.get_rect(center=(center_x, 50)))
+
+        rules = [
+            "Click a cell to reveal it.",
+            "Right-click a cell to mark it as a mine.",
+            "Mark all mines successfully to win!",
+            "Scroll with the arrow keys or by dragging with the middle button;",
+            "zoom with the mouse wheel.",
+            "",
+            "Press any key to start..."
+        ]
+        for i, rule in enumerate(rules):
+            line = self.instruction_font.render(rule, True, WHITE)
+            screen.blit(line, line.get_rect(center=(center_x, 150 + 30 * i)))
 
 
 def main():
     """Main game loop with pygame visualization."""
-    
+    parser = argparse.ArgumentParser(description="Play Minesweeper or watch the AI play.")
+    parser.add_argument('--height', type=int, default=HEIGHT, help="number of rows")
+    parser.add_argument('--width', type=int, default=WIDTH, help="number of columns")
+    parser.add_argument('--mines', type=int, default=MINES, help="number of mines")
+    parser.add_argument('--interval', type=float, default=AI_MOVE_INTERVAL,
+                        help="seconds between AI moves")
+    args = parser.parse_args()
+    board_rows, board_columns, mines = args.height, args.width, args.mines
+    if not (0 < board_rows and 0 < board_columns and 0 <= mines < board_rows * board_columns):
+        parser.error(f"invalid board {board_rows}x{board_columns} with {mines} mines")
+
     # Initialize pygame
     pygame.init()
-    
-    # Calculate display dimensions
-    board_width = (WIDTH * (CELL_SIZE + CELL_SPACING)) - CELL_SPACING
-    board_height = (HEIGHT * (CELL_SIZE + CELL_SPACING)) - CELL_SPACING
-    
-    width = board_width + 2 * BOARD_PADDING
-    height = board_height + 2 * BOARD_PADDING + 130
-    
+
+    # Calculate display dimensions: the board is shown whole if it fits at
+    # some cell size, and through a scrollable viewport otherwise
+    cell_size = fit_cell_size(board_rows, board_columns)
+    viewport = pygame.Rect(BOARD_PADDING, BOARD_PADDING,
+                           min(board_pixels(board_columns, cell_size), MAX_VIEW_WIDTH),
+                           min(board_pixels(board_rows, cell_size), MAX_VIEW_HEIGHT))
+
+    width = max(viewport.width + 2 * BOARD_PADDING, MIN_WINDOW_WIDTH)
+    height = max(viewport.height + 2 * BOARD_PADDING + PANEL_HEIGHT, MIN_WINDOW_HEIGHT)
+
     screen = pygame.display.set_mode((width, height))
     pygame.display.set_caption("Minesweeper AI")
+    view = BoardView(screen, board_rows, board_columns, cell_size, viewport)
+    clock = pygame.time.Clock()
 
-    # Fonts
-    flag_font = pygame.font.Font(None, FLAG_FONT_SIZE)
-    number_font = pygame.font.Font(None, NUMBER_FONT_SIZE)
-    instruction_font = pygame.font.Font(None, INSTRUCTION_FONT_SIZE)
-    medium_font = pygame.font.Font(None, 24)
-
-    # Create game and AI agent
-    game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-    ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+    # Create the game and AI agent on the worker thread
+    move_interval = args.interval
+    worker = AIWorker(board_rows, board_columns, mines, move_interval)
 
-    # Track revealed cells and flagged cells
-    revealed = set()
+    # Track revealed cells (with their nearby-mine counts) and flagged cells
+    revealed = {}
     flags = set()
     lost = False
-    
+    exploded = None
+    ai_info = worker.ai.get_knowledge_summary()
+
     # AI play variables
     ai_playing = False
-    ai_move_delay = 0.3  # seconds between AI moves
 
     # Instructions
     instructions = True
 
+    # What needs drawing: everything, the panel, or just some cells
+    redraw_all = True
+    panel_dirty = False
+    dirty_cells = set()
+
+    # Whether the middle button is held to drag the board
+    panning = False
+
     while True:
-        # Check for game quit
+        won = worker.mines == flags
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                worker.close()
                 pygame.quit()
                 sys.exit()
 
-        screen.fill(BLACK)
+            # Wait for a key press on the start screen
+            if instructions:
+                if event.type == pygame.KEYDOWN:
+                    instructions = False
+                    redraw_all = True
+                continue
 
-        # Show instructions initially
-        if instructions:
-            # Title
-            title = medium_font.render("Play Minesweeper", True, WHITE)
-            title_rect = title.get_rect()
-            title_rect.center = (width / 2, 50)
-            screen.blit(title, title_rect)
-
-            # Rules
-            rules = [
-                "Click a cell to reveal it.",
-                "Right-click a cell to mark it as a mine.",
-                "Mark all mines successfully to win!",
-                "",
-                "Press any key to start..."
-            ]
-            for i, rule in enumerate(rules):
-                line = instruction_font.render(rule, True, WHITE)
-                line_rect = line.get_rect()
-                line_rect.center = (width / 2, 150 + 30 * i)
-                screen.blit(line, line_rect)
-
-            pygame.display.flip()
-
-            # Wait for key press
-            waiting = True
-            while waiting:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        sys.exit()
-                    if event.type == pygame.KEYDOWN:
-                        waiting = False
-                        instructions = False
-
-            continue
-
-        # Draw board
-        cells = []
-        for i in range(HEIGHT):
-            row = []
-            for j in range(WIDTH):
-                # Calculate cell position
-                rect = pygame.Rect(
-                    BOARD_PADDING + j * (CELL_SIZE + CELL_SPACING),
-                    BOARD_PADDING + i * (CELL_SIZE + CELL_SPACING),
-                    CELL_SIZE, CELL_SIZE
-                )
-
-                # Color cell based on state
-                if (i, j) in revealed:
-                    # Revealed cell
-                    if game.is_mine((i, j)):
-                        # Mine - red
-                        pygame.draw.rect(screen, RED, rect)
-                        pygame.draw.rect(screen, DARK_GRAY, rect, 2)
-                        # Draw mine symbol
-                        mine_text = flag_font.render("💣", True, BLACK)
-                        mine_rect = mine_text.get_rect()
-                        mine_rect.center = rect.center
-                        screen.blit(mine_text, mine_rect)
-                    else:
-                        # Safe cell
-                        pygame.draw.rect(screen, LIGHT_GRAY, rect)
-                        pygame.draw.rect(screen, DARK_GRAY, rect, 2)
-                        # Show number of nearby mines
-                        nearby = game.nearby_mines((i, j))
-                        if nearby > 0:
-                            # Color based on number
-                            colors = [None, BLUE, GREEN, RED, (128, 0, 128), 
-                                    (255, 140, 0), (0, 128, 128), BLACK, DARK_GRAY]
-                            number_text = number_font.render(str(nearby), True, colors[nearby])
-                            number_rect = number_text.get_rect()
-                            number_rect.center = rect.center
-                            screen.blit(number_text, number_rect)
-                elif (i, j) in flags:
-                    # Flagged cell
-                    pygame.draw.rect(screen, GRAY, rect)
-                    pygame.draw.rect(screen, DARK_GRAY, rect, 2)
-                    flag_text = flag_font.render("🚩", True, RED)
-                    flag_rect = flag_text.get_rect()
-                    flag_rect.center = rect.center
-                    screen.blit(flag_text, flag_rect)
+            # Zoom around the mouse with the wheel
+            if event.type == pygame.MOUSEWHEEL:
+                if event.y > 0:
+                    new_size = max(view.cell_size + 1, int(view.cell_size * ZOOM_STEP))
                 else:
-                    # Unrevealed cell
-                    pygame.draw.rect(screen, GRAY, rect)
-                    pygame.draw.rect(screen, DARK_GRAY, rect, 2)
+                    new_size = min(view.cell_size - 1, int(view.cell_size / ZOOM_STEP))
+                view.set_cell_size(new_size, pygame.mouse.get_pos())
+                redraw_all = True
+                continue
 
-                row.append(rect)
-            cells.append(row)
+            # Drag with the middle button to scroll
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 2:
+                panning = True
+                continue
+            if event.type == pygame.MOUSEBUTTONUP and event.button == 2:
+                panning = False
+                continue
+            if event.type == pygame.MOUSEMOTION:
+                if panning:
+                    view.scroll(-event.rel[0], -event.rel[1])
+                    redraw_all = True
+                continue
 
-        # Draw buttons
-        button_y = board_height + 2 * BOARD_PADDING + 10
-        
-        # AI Move button
-        ai_button = pygame.Rect(BOARD_PADDING, button_y, 150, 35)
-        ai_button_text = "AI Move" if not ai_playing else "Stop AI"
-        button_color = GREEN if not ai_playing else RED
-        pygame.draw.rect(screen, button_color, ai_button)
-        ai_text = instruction_font.render(ai_button_text, True, WHITE)
-        ai_text_rect = ai_text.get_rect()
-        ai_text_rect.center = ai_button.center
-        screen.blit(ai_text, ai_text_rect)
+            # Arrow keys scroll, +/- change how fast the AI plays
+            if event.type == pygame.KEYDOWN:
+                if event.key in SCROLL_KEYS:
+                    view.scroll(*SCROLL_KEYS[event.key])
+                    redraw_all = True
+                    continue
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    move_interval = max(MIN_MOVE_INTERVAL, move_interval / 2)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    move_interval = min(MAX_MOVE_INTERVAL, move_interval * 2)
+                else:
+                    continue
+                worker.set_interval(move_interval)
+                panel_dirty = True
+                continue
 
-        # Reset button
-        reset_button = pygame.Rect(BOARD_PADDING + 160, button_y, 100, 35)
-        pygame.draw.rect(screen, DARK_GRAY, reset_button)
-        reset_text = instruction_font.render("Reset", True, WHITE)
-        reset_text_rect = reset_text.get_rect()
-        reset_text_rect.center = reset_button.center
-        screen.blit(reset_text, reset_text_rect)
-
-        # Display game status
-        status_text = ""
-        status_color = WHITE
-        
-        if lost:
-            status_text = "Game Over - Mine Hit!"
-            status_color = RED
-        elif game.mines == flags:
-            status_text = "Victory!"
-            status_color = GREEN
-        else:
-            status_text = f"Mines: {MINES} | Flags: {len(flags)} | Revealed: {len(revealed)}"
-            
-        status = instruction_font.render(status_text, True, status_color)
-        status_rect = status.get_rect()
-        status_rect.center = (width / 2, button_y + 55)
-        screen.blit(status, status_rect)
-
-        # AI knowledge display
-        ai_info = ai.get_knowledge_summary()
-        ai_status = instruction_font.render(
-            f"AI: {ai_info['known_safes']} safes, {ai_info['known_mines']} mines, "
-            f"{ai_info['sentences']} rules",
-            True, BLUE
-        )
-        ai_status_rect = ai_status.get_rect()
-        ai_status_rect.center = (width / 2, button_y + 80)
-        screen.blit(ai_status, ai_status_rect)
-
-        pygame.display.flip()
-
-        # Handle AI playing
-        if ai_playing and not lost and game.mines != flags:
-            time.sleep(ai_move_delay)
-            
-            # Try to make a safe move
-            move = ai.make_safe_move()
-            if move is None:
-                # No safe move, make a random move
-                move = ai.make_random_move()
-                if move is None:
-                    # No moves left
-                    ai_playing = False
+            # Wheel steps also arrive as buttons 4 and 5
+            if event.type != pygame.MOUSEBUTTONDOWN or event.button not in (1, 3):
+                continue
+            mouse_pos = event.pos
+            panel_dirty = True
+
+            # Check if AI button clicked
+            if view.ai_button.collidepoint(mouse_pos):
+                if not lost and not won:
+                    ai_playing = not ai_playing
+                    worker.play(ai_playing)
+
+            # Check if reset button clicked
+            elif view.reset_button.collidepoint(mouse_pos):
+                worker.close()
+                worker = AIWorker(board_rows, board_columns, mines, move_interval)
+                revealed = {}
+                flags = set()
+                lost = False
+                exploded = None
+                ai_info = worker.ai.get_knowledge_summary()
+                ai_playing = False
+                view.clear()
+                dirty_cells.clear()
+                redraw_all = True
+
+            # Check if a cell was clicked
+            elif not lost and not won:
+                cell = view.cell_at(mouse_pos)
+                if cell is None:
                     continue
 
-            # Make the move
-            if move:
-                if game.is_mine(move):
-                    lost = True
-                    ai_playing = False
-                else:
-                    nearby = game.nearby_mines(move)
-                    revealed.add(move)
-                    ai.add_knowledge(move, nearby)
+                # Left click - reveal
+                if event.button == 1:
+                    if cell not in flags and cell not in revealed:
+                        worker.reveal(cell)
 
-            continue
+                # Right click - flag
+                elif event.button == 3:
+                    if cell not in revealed:
+                        if cell in flags:
+                            flags.remove(cell)
+                        else:
+                            flags.add(cell)
+                            worker.flag(cell)
+                        dirty_cells.add(cell)
 
-        # Handle user input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                
-                # Check if AI button clicked
-                if ai_button.collidepoint(mouse_pos):
-                    if not lost and game.mines != flags:
-                        ai_playing = not ai_playing
-                
-                # Check if reset button clicked
-                elif reset_button.collidepoint(mouse_pos):
-                    game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-                    ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-                    revealed = set()
-                    flags = set()
-                    lost = False
-                    ai_playing = False
-                
-                # Check if a cell was clicked
-                elif not lost and game.mines != flags:
-                    for i in range(HEIGHT):
-                        for j in range(WIDTH):
-                            if cells[i][j].collidepoint(mouse_pos):
-                                # Left click - reveal
-                                if event.button == 1:
-                                    if (i, j) not in flags and (i, j) not in revealed:
-                                        if game.is_mine((i, j)):
-                                            lost = True
-                                        else:
-                                            nearby = game.nearby_mines((i, j))
-                                            revealed.add((i, j))
-                                            ai.add_knowledge((i, j), nearby)
-                                
-                                # Right click - flag
-                                elif event.button == 3:
-                                    if (i, j) not in revealed:
-                                        if (i, j) in flags:
-                                            flags.remove((i, j))
-                                        else:
-                                            flags.add((i, j))
-                                            ai.mark_mine((i, j))
+        # Apply the moves the worker has finished
+        for result in worker.poll():
+            kind, ai_info = result[0], result[-1]
+            panel_dirty = True
+            if kind == 'revealed':
+                revealed.update(result[1])
+                dirty_cells.update(cell for cell, nearby in result[1])
+            elif kind == 'exploded':
+                lost = True
+                exploded = result[1]
+                dirty_cells.add(exploded)
+                ai_playing = False
+            elif kind == 'idle':
+                ai_playing = False
+
+        # Stop the AI once the game is won
+        if ai_playing and worker.mines == flags:
+            ai_playing = False
+            worker.play(False)
+
+        # Draw only what changed since the last frame
+        if instructions:
+            if redraw_all:
+                view.draw_instructions()
+                pygame.display.flip()
+                redraw_all = False
+        elif redraw_all or panel_dirty or dirty_cells:
+            if lost:
+                status_text, status_color = "Game Over - Mine Hit!", RED
+            elif worker.mines == flags:
+                status_text, status_color = "Victory!", GREEN
+            else:
+                status_text = f"Mines: {mines} | Flags: {len(flags)} | Revealed: {len(revealed)}"
+                status_color = WHITE
+
+            # AI knowledge display, as of the worker's last move
+            ai_text = (f"AI: {ai_info['known_safes']} safes, {ai_info['known_mines']} mines, "
+                       f"{ai_info['sentences']} rules | every {move_interval:.2f}s (+/-)")
+
+            rects = [view.draw_cell(cell, revealed, flags, exploded) for cell in dirty_cells]
+            if redraw_all:
+                view.draw_board(revealed, flags, exploded)
+                view.draw_panel(ai_playing, status_text, status_color, ai_text)
+                pygame.display.flip()
+            else:
+                rects = [rect for rect in rects if rect is not None]
+                rects.append(view.draw_panel(ai_playing, status_text, status_color, ai_text))
+                pygame.display.update(rects)
+
+            redraw_all = False
+            panel_dirty = False
+            dirty_cells.clear()
+
+        clock.tick(FPS)
 
 
 if __name__ == "__main__":
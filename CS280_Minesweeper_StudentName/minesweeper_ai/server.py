@@ -0,0 +1,381 @@
+"""
+Minesweeper Game Server
+Hosts many concurrent games with their AI agents behind a local asyncio TCP server.
+
+The protocol is one JSON object per line in each direction. Every request
+has an "op" and gets one response with "ok" set to true or false:
+
+    {"op": "new", "height": 8, "width": 8, "mines": 10, "seed": 1}
+        -> {"ok": true, "session": 3}
+    {"op": "reveal", "session": 3, "cell": [2, 5]}
+        -> {"ok": true, "mine": false, "revealed": [[2, 5, 1]], "won": false}
+    {"op": "flag", "session": 3, "cell": [0, 0]}
+        -> {"ok": true, "flagged": true}
+    {"op": "suggest", "session": 3}
+        -> {"ok": true, "cell": [4, 4], "safe": true}
+    {"op": "close", "session": 3}
+        -> {"ok": true}
+    {"op": "stats"}
+        -> {"ok": true, "sessions": 12, "requests": 3400}
+
+Games and agents live in worker processes, each session pinned to one
+worker, so inference for a slow board runs in parallel with other boards
+and never blocks the event loop.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper import Minesweeper
+from ai_agent import MinesweeperAI
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Largest request line accepted, in bytes
+MAX_LINE = 1 << 20
+
+# Largest board accepted, in cells; a session's game, agent and neighbor
+# tables grow with its board, so this bounds the memory of each session
+MAX_CELLS = 1 << 16
+
+
+class GameSession:
+    """
+    One game and the AI agent that follows it.
+
+    The agent is told about every revealed cell, whoever chose it, so its
+    suggestions always reflect the current board. Cells are (i, j) pairs
+    on the wire and flat indices inside.
+    """
+
+    def __init__(self, height, width, mines, seed=None, max_cells=MAX_CELLS):
+        """
+        Start a new game.
+
+        Args:
+            height: Number of rows
+            width: Number of columns
+            mines: Number of mines
+            seed: Seed for the board and the AI's guesses, or None
+            max_cells: Largest board allowed, in cells
+
+        Raises:
+            ValueError: If the board is impossible or too large
+        """
+        if not (0 < height and 0 < width and 0 <= mines < height * width):
+            raise ValueError(f"Invalid board {height}x{width} with {mines} mines")
+        if height * width > max_cells:
+            raise ValueError(f"Board {height}x{width} exceeds the limit of {max_cells} cells")
+        rng = random.Random(seed)
+        self.game = Minesweeper(height=height, width=width, mines=mines, compact=True, rng=rng)
+        self.ai = MinesweeperAI(height=height, width=width, compact=True, mines=mines, rng=rng)
+        self.safe_cells = height * width - mines
+        self.over = False
+
+    def _index(self, cell):
+        """
+        Flat index of a cell from a request, checking it is on the board.
+        """
+        i, j = cell
+        if not (0 <= i < self.game.height and 0 <= j < self.game.width):
+            raise ValueError(f"Cell {cell} is off the board")
+        return self.game.to_index((i, j))
+
+    def reveal(self, cell):
+        """
+        Reveal a cell.
+
+        Args:
+            cell: [i, j] of the cell
+
+        Returns:
+            Response with whether it was a mine, the newly revealed cells as
+            [i, j, count] triples and whether the game is now won
+        """
+        if self.over:
+            raise ValueError("Game is over")
+        index = self._index(cell)
+        if self.game.is_mine(index):
+            self.over = True
+            return {'mine': True, 'revealed': [], 'won': False}
+
+        newly_revealed = self.game.reveal(index)
+        self.ai.add_knowledge_many(newly_revealed)
+        game = self.game
+        won = len(game.revealed) == self.safe_cells
+        self.over = won
+        return {
+            'mine': False,
+            'revealed': [list(game.to_cell(flat)) + [count] for flat, count in newly_revealed],
+            'won': won
+        }
+
+    def flag(self, cell):
+        """
+        Toggle a flag on a cell.
+
+        Args:
+            cell: [i, j] of the cell
+
+        Returns:
+            Response with whether the cell is now flagged
+        """
+        index = self._index(cell)
+        if index in self.game.mines_found:
+            self.game.mines_found.remove(index)
+            return {'flagged': False}
+        self.game.mines_found.add(index)
+        return {'flagged': True}
+
+    def suggest(self):
+        """
+        Ask the AI for its next move.
+
+        Returns:
+            Response with the suggested [i, j] (or None if there is no move)
+            and whether the move is known to be safe
+        """
+        move = self.ai.make_safe_move()
+        safe = move is not None
+        if not safe:
+            move = self.ai.make_random_move()
+        if move is None:
+            return {'cell': None, 'safe': False}
+        return {'cell': list(self.game.to_cell(move)), 'safe': safe}
+
+
+# Sessions held by this worker process, by session id
+_sessions = {}
+
+
+def run_session_request(session_id, request, max_cells=MAX_CELLS):
+    """
+    Carry out one request in the worker process that owns the session.
+
+    Args:
+        session_id: Id of the session
+        request: Decoded request
+        max_cells: Largest board a new session may have, in cells
+
+    Returns:
+        Response fields, without "ok"
+    """
+    op = request['op']
+    if op == 'new':
+        _sessions[session_id] = GameSession(
+            int(request.get('height', 8)), int(request.get('width', 8)),
+            int(request.get('mines', 8)), request.get('seed'), max_cells)
+        return {'session': session_id}
+
+    session = _sessions.get(session_id)
+    if session is None:
+        raise ValueError(f"Unknown session {session_id}")
+    if op == 'reveal':
+        return session.reveal(request['cell'])
+    if op == 'flag':
+        return session.flag(request['cell'])
+    if op == 'suggest':
+        return session.suggest()
+    if op == 'close':
+        del _sessions[session_id]
+        return {}
+    raise ValueError(f"Unknown op {op!r}")
+
+
+class MinesweeperServer:
+    """
+    Asyncio TCP server that routes requests to sessions in worker processes.
+
+    Each worker is a single-process pool, so the sessions it owns stay in
+    that process between requests. A session's requests are handled one at
+    a time, in order; requests for different sessions run concurrently.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_cells=MAX_CELLS):
+        """
+        Configure the server.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            workers: Number of worker processes (default: one per CPU)
+            max_cells: Largest board a client may start, in cells
+        """
+        self.host = host
+        self.port = port
+        self.max_cells = max_cells
+        self.workers = [ProcessPoolExecutor(max_workers=1)
+                        for _ in range(workers or os.cpu_count() or 1)]
+        self.sessions = {}
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._server = None
+
+    async def start(self):
+        """
+        Start the worker processes, then start listening; self.port holds
+        the actual port afterwards.
+
+        Workers are started before any client connects: a worker forked
+        later would inherit the open client sockets and keep them open, so
+        clients that disconnect would never be noticed.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(worker, os.getpid)
+                               for worker in self.workers))
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Start the server if needed and handle clients until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop accepting clients and shut the worker processes down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for worker in self.workers:
+            worker.shutdown()
+
+    async def _handle_client(self, reader, writer):
+        """
+        Answer one client's requests, in order, until it disconnects.
+
+        Sessions the client started and did not close are closed when it
+        disconnects, so abandoned games do not pile up in the workers.
+        """
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_request(line, owned)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            for session_id in owned:
+                await self._close_session(session_id)
+
+    async def _close_session(self, session_id):
+        """
+        Close a session in its worker, if it is still open.
+
+        Args:
+            session_id: Id of the session
+        """
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            return
+        worker, lock = entry
+        async with lock:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(worker, run_session_request, session_id,
+                                           {'op': 'close'}, self.max_cells)
+            except Exception:
+                # Already closed, or the worker is gone along with its sessions
+                pass
+        self.sessions.pop(session_id, None)
+
+    async def handle_request(self, line, owned=None):
+        """
+        Decode a request line and produce its response.
+
+        Args:
+            line: One request as JSON
+            owned: Set of the ids of sessions started on the requesting
+                connection, updated as sessions are started and closed
+
+        Returns:
+            Response dictionary
+        """
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            op = request.get('op')
+            if op == 'stats':
+                return {'ok': True, 'sessions': len(self.sessions), 'requests': self.requests}
+
+            if op == 'new':
+                session_id = next(self._ids)
+                self.sessions[session_id] = (self.workers[session_id % len(self.workers)],
+                                             asyncio.Lock())
+            else:
+                session_id = request.get('session')
+                if session_id not in self.sessions:
+                    raise ValueError(f"Unknown session {session_id}")
+
+            worker, lock = self.sessions[session_id]
+            async with lock:
+                loop = asyncio.get_running_loop()
+                try:
+                    result = await loop.run_in_executor(
+                        worker, run_session_request, session_id, request, self.max_cells)
+                except Exception:
+                    if op == 'new':
+                        del self.sessions[session_id]
+                    raise
+            if op == 'close':
+                self.sessions.pop(session_id, None)
+            if owned is not None:
+                if op == 'new':
+                    owned.add(session_id)
+                elif op == 'close':
+                    owned.discard(session_id)
+        except Exception as e:
+            # Any failure is reported to the client, which keeps its connection
+            return {'ok': False, 'error': str(e) or type(e).__name__}
+
+        response = {'ok': True}
+        response.update(result)
+        return response
+
+
+def main():
+    """Run the server from the command line."""
+    parser = argparse.ArgumentParser(description="Serve Minesweeper games and AI moves over TCP.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--max-cells', type=int, default=MAX_CELLS,
+                        help="largest board a client may start, in cells")
+    args = parser.parse_args()
+
+    server = MinesweeperServer(args.host, args.port, args.workers, args.max_cells)
+
+    async def serve():
+        await server.start()
+        print(f"Serving on {server.host}:{server.port} with {len(server.workers)} workers")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,69 @@ import random
 from minesweeper import Minesweeper
 from ai_agent import MinesweeperAI
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from corpus import unpack_layout
+from profiling import PhaseProfiler
+from results import RunningStats
+from batch_sim import BatchSimulator
 import json
 
 
+def play_seeded_game(args):
+    """
+    Play one game from a seed, for running games in worker processes.
+    
+    The board and the AI share a generator seeded just before the game
+    starts, so the board and every guess depend only on the seed, not on
+    which process runs it or what ran there before. A seed of None uses
+    the random module's shared generator instead.
+    
+    Args:
+        args: Tuple (height, width, mines, seed, profile)
+        
+    Returns:
+        Dictionary with game statistics, as from run_single_game
+    """
+    height, width, mines, seed, profile = args
+    rng = random.Random(seed) if seed is not None else None
+    return MinesweeperTester().run_single_game(height, width, mines, rng=rng, profile=profile)
+
+
+def play_corpus_game(args):
+    """
+    Replay one corpus board, for running games in worker processes.
+    
+    Args:
+        args: Tuple (height, width, mines, seed, packed layout, first click,
+            profile), where the seed drives the AI's guesses
+        
+    Returns:
+        Dictionary with game statistics, as from run_single_game
+    """
+    height, width, mines, seed, packed, first_move, profile = args
+    return MinesweeperTester().run_single_game(
+        height, width, mines, rng=random.Random(seed),
+        layout=unpack_layout(packed), first_move=first_move, profile=profile)
+
+
 class MinesweeperTester:
     """
     Testing framework for evaluating Minesweeper AI performance.
     """
 
-    def __init__(self):
-        """Initialize the tester."""
+    def __init__(self, sink=None):
+        """
+        Initialize the tester.
+        
+        Args:
+            sink: JsonlResultSink that game results are streamed to; without
+                one they are kept in self.results
+        """
         self.results = []
+        self.sink = sink
 
-    def run_single_game(self, height, width, mines, verbose=False):
+    def run_single_game(self, height, width, mines, verbose=False, rng=None,
+                        layout=None, first_move=None, profile=False):
         """
         Run a single game and return the result.
         
@@ -28,15 +78,26 @@ class MinesweeperTester:
             width: Board width
             mines: Number of mines
             verbose: Print detailed game progress
+            rng: random.Random instance for the board and the AI's guesses
+                (default: the random module's shared generator)
+            layout: Flat indices of the mines, to replay a stored board
+            first_move: Flat index of the first cell to reveal instead of
+                asking the AI; it counts as a random move
+            profile: Record per-phase timings, returned under 'profile' as
+                a PhaseProfiler
             
         Returns:
             Dictionary with game statistics
         """
-        game = Minesweeper(height=height, width=width, mines=mines)
-        ai = MinesweeperAI(height=height, width=width)
+        # Compact mode: cells are flat indices, converted only for display
+        game = Minesweeper(height=height, width=width, mines=mines, compact=True,
+                           rng=rng, layout=layout)
+        profiler = PhaseProfiler() if profile else None
+        ai = MinesweeperAI(height=height, width=width, compact=True, mines=mines, rng=rng,
+                           profiler=profiler)
         
-        revealed = set()
-        flags = set()
+        revealed = game.revealed
+        won = False
         move_count = 0
         safe_moves = 0
         random_moves = 0
@@ -52,7 +113,12 @@ class MinesweeperTester:
             
             # Try safe move first
             move = ai.make_safe_move()
-            if move:
+            if first_move is not None:
+                # Replayed opening click
+                move, first_move = first_move, None
+                random_moves += 1
+                move_type = "FIRST"
+            elif move is not None:
                 safe_moves += 1
                 move_type = "SAFE"
             else:
@@ -69,7 +135,7 @@ class MinesweeperTester:
             
             if verbose:
                 knowledge = ai.get_knowledge_summary()
-                print(f"\nMove {move_count} ({move_type}): {move}")
+                print(f"\nMove {move_count} ({move_type}): {game.to_cell(move)}")
                 print(f"  Knowledge: {knowledge['known_safes']} safe, "
                       f"{knowledge['known_mines']} mines, {knowledge['sentences']} rules")
             
@@ -77,27 +143,19 @@ class MinesweeperTester:
             if game.is_mine(move):
                 if verbose:
                     print(f"  Result: HIT A MINE! Game Over.")
-                return {
-                    'won': False,
-                    'moves': move_count,
-                    'safe_moves': safe_moves,
-                    'random_moves': random_moves,
-                    'height': height,
-                    'width': width,
-                    'mines': mines,
-                    'revealed': len(revealed),
-                    'accuracy': safe_moves / move_count if move_count > 0 else 0
-                }
+                break
             
-            # Reveal the cell
-            revealed.add(move)
-            nearby = game.nearby_mines(move)
+            # Reveal the cell, along with any open region around it
+            newly_revealed = game.reveal(move)
+            nearby = newly_revealed[0][1]
             
             if verbose:
                 print(f"  Result: Safe! {nearby} nearby mines")
+                if len(newly_revealed) > 1:
+                    print(f"  Opened {len(newly_revealed) - 1} more cells")
             
             # Update AI knowledge
-            ai.add_knowledge(move, nearby)
+            ai.add_knowledge_many(newly_revealed)
             
             # Check for win (all non-mine cells revealed)
             total_cells = height * width
@@ -106,21 +164,12 @@ class MinesweeperTester:
                     print(f"\n{'='*60}")
                     print(f"VICTORY! All safe cells revealed!")
                     print(f"{'='*60}")
-                return {
-                    'won': True,
-                    'moves': move_count,
-                    'safe_moves': safe_moves,
-                    'random_moves': random_moves,
-                    'height': height,
-                    'width': width,
-                    'mines': mines,
-                    'revealed': len(revealed),
-                    'accuracy': safe_moves / move_count if move_count > 0 else 0
-                }
-        
-        # Game ended without win or loss (no moves available)
-        return {
-            'won': False,
+                won = True
+                break
+        
+        # Lost on a mine, won, or ran out of moves
+        result = {
+            'won': won,
             'moves': move_count,
             'safe_moves': safe_moves,
             'random_moves': random_moves,
@@ -130,65 +179,250 @@ class MinesweeperTester:
             'revealed': len(revealed),
             'accuracy': safe_moves / move_count if move_count > 0 else 0
         }
+        if profiler is not None:
+            result['profile'] = profiler
+        return result
 
-    def run_multiple_games(self, height, width, mines, num_games=100, verbose=False):
+    def run_multiple_games(self, height, width, mines, num_games=100, verbose=False,
+                           workers=1, chunksize=None, seed=None, profile=False):
         """
         Run multiple games and collect statistics.
         
+        With a seed, each game gets its own seed drawn from it, so the results
+        are the same however many workers run them. With more than one
+        worker, games are spread over a pool of processes and their results
+        are merged in game order.
+        
         Args:
             height: Board height
             width: Board width
             mines: Number of mines
             num_games: Number of games to run
             verbose: Print progress
+            workers: Number of worker processes (1 runs games in this process)
+            chunksize: Games sent to a worker at a time (default: a quarter
+                of each worker's share)
+            seed: Master seed for reproducible runs
+            profile: Time the AI's phases and report their percentiles
+                under 'profile' (see PhaseProfiler.report)
             
         Returns:
             Dictionary with aggregated statistics
         """
-        wins = 0
-        total_moves = 0
-        total_safe_moves = 0
-        total_random_moves = 0
-        total_revealed = 0
-        
         print(f"\nRunning {num_games} games on {height}x{width} board with {mines} mines...")
         
-        for i in range(num_games):
-            if verbose or (i + 1) % 10 == 0:
-                print(f"  Game {i + 1}/{num_games}...", end='\r')
+        # Independent per-game seeds; parallel runs always need them so that
+        # workers don't share random state
+        if seed is None and workers > 1:
+            seed = random.getrandbits(64)
+        if seed is not None:
+            master = random.Random(seed)
+            games = [(height, width, mines, master.getrandbits(64), profile)
+                     for _ in range(num_games)]
+        else:
+            games = [(height, width, mines, None, profile)] * num_games
+        
+        run = f"{height}x{width}x{mines} seed={seed}"
+        return self._run_games(play_seeded_game, games, run, height, width, mines,
+                               verbose, workers, chunksize)
+
+    def run_corpus(self, corpus, verbose=False, workers=1, chunksize=None, seed=0,
+                   profile=False):
+        """
+        Replay every board of a corpus and collect statistics.
+        
+        Each game starts from the board's stored first click, and the AI's
+        guesses are seeded per game from seed, so two runs with the same
+        corpus and seed see identical inputs: differences in the results
+        come from the agent alone.
+        
+        Args:
+            corpus: BoardCorpus to replay
+            verbose: Print progress
+            workers: Number of worker processes (1 runs games in this process)
+            chunksize: Games sent to a worker at a time (default: a quarter
+                of each worker's share)
+            seed: Master seed for the AI's guesses
+            profile: Time the AI's phases and report their percentiles
             
-            result = self.run_single_game(height, width, mines, verbose=False)
-            self.results.append(result)
+        Returns:
+            Dictionary with aggregated statistics, as from run_multiple_games
+        """
+        height, width, mines = corpus.height, corpus.width, corpus.mines
+        print(f"\nReplaying {len(corpus)} boards of {height}x{width} with {mines} mines...")
+        
+        master = random.Random(seed)
+        games = [(height, width, mines, master.getrandbits(64), packed, first_click, profile)
+                 for packed, first_click in corpus.boards]
+        run = f"corpus {height}x{width}x{mines} boards={len(corpus)} seed={seed}"
+        return self._run_games(play_corpus_game, games, run, height, width, mines,
+                               verbose, workers, chunksize)
+
+    def run_batch(self, height, width, mines, num_games=1000, verbose=False,
+                  batch_size=1000, seed=None):
+        """
+        Run games in lockstep batches with the NumPy batch simulator and
+        collect statistics.
+        
+        Games are played by the same rules as run_multiple_games, but on
+        boards generated differently, so the same seed gives different games
+        and win rates agree only within sampling noise. Move counts can also
+        differ slightly because the simulator opens safe cells in a
+        different order.
+        
+        Args:
+            height: Board height
+            width: Board width
+            mines: Number of mines
+            num_games: Number of games to run
+            verbose: Print progress
+            batch_size: Games simulated together
+            seed: Master seed for reproducible runs
             
-            if result['won']:
-                wins += 1
-            total_moves += result['moves']
-            total_safe_moves += result['safe_moves']
-            total_random_moves += result['random_moves']
-            total_revealed += result['revealed']
+        Returns:
+            Dictionary with aggregated statistics, as from run_multiple_games
+        """
+        print(f"\nRunning {num_games} batched games on {height}x{width} board with {mines} mines...")
+        
+        if seed is None:
+            seed = random.getrandbits(64)
+        master = random.Random(seed)
+        batches = [(start, min(batch_size, num_games - start), master.getrandbits(64))
+                   for start in range(0, num_games, batch_size)]
+        
+        # The last batch's boards depend on the game count, so it is part
+        # of the run name
+        run = f"batch {height}x{width}x{mines} games={num_games} size={batch_size} seed={seed}"
+        stats, done = self._resume(run, num_games)
         
+        def results():
+            for start, count, batch_seed in batches:
+                if all(start + k in done for k in range(count)):
+                    continue
+                simulator = BatchSimulator(height, width, mines, count, seed=batch_seed)
+                for k, result in enumerate(simulator.run()):
+                    if start + k not in done:
+                        yield start + k, result
+        
+        return self._collect_statistics(results(), stats, run, num_games,
+                                        height, width, mines, verbose)
+
+    def _resume(self, run, num_games):
+        """
+        Read back the games of a run that the sink already holds.
+        
+        Args:
+            run: Name identifying the run in the sink
+            num_games: Number of games in the run
+            
+        Returns:
+            Tuple (stats, done): RunningStats of the games on file and the
+            set of their indices
+        """
+        stats = RunningStats()
+        done = set()
+        if self.sink is not None:
+            for index, result in self.sink.completed(run):
+                # Results beyond this run's games belong to a longer run
+                if index < num_games and index not in done:
+                    done.add(index)
+                    stats.add(result)
+            if done:
+                print(f"  Resuming: {len(done)} games already played")
+        return stats, done
+
+    def _run_games(self, play, games, run, height, width, mines, verbose, workers, chunksize):
+        """
+        Play games with a module-level function, in this process or spread
+        over a pool of worker processes, and collect their statistics.
+        
+        When results go to a sink, games of this run that it already holds
+        are read back instead of played, so an interrupted run resumes
+        where it stopped.
+        
+        Args:
+            play: Function taking one entry of games and returning its result
+            games: List of argument tuples, one per game
+            run: Name identifying the run in the sink
+            height: Board height
+            width: Board width
+            mines: Number of mines
+            verbose: Print progress
+            workers: Number of worker processes
+            chunksize: Games sent to a worker at a time
+            
+        Returns:
+            Dictionary with aggregated statistics
+        """
+        num_games = len(games)
+        stats, done = self._resume(run, num_games)
+        pending = [index for index in range(num_games) if index not in done]
+        games = [games[index] for index in pending]
+        
+        executor = None
+        if workers > 1:
+            if chunksize is None:
+                chunksize = max(1, len(games) // (workers * 4))
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(play, games, chunksize=chunksize)
+        else:
+            results = map(play, games)
+        
+        try:
+            return self._collect_statistics(zip(pending, results), stats, run, num_games,
+                                            height, width, mines, verbose)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _collect_statistics(self, results, stats, run, num_games, height, width, mines,
+                            verbose):
+        """
+        Record game results as they arrive and aggregate them.
+        
+        Each result is streamed to the sink if there is one, otherwise kept
+        in self.results; either way the summary comes from running totals.
+        Profilers returned with the results are merged into one report for
+        the configuration and are not recorded with the results.
+        
+        Args:
+            results: Iterable of (game index, result dictionary) pairs
+            stats: RunningStats holding any games played earlier in the run
+            run: Name identifying the run in the sink
+            num_games: Number of games in the run
+            height: Board height
+            width: Board width
+            mines: Number of mines
+            verbose: Print progress
+            
+        Returns:
+            Dictionary with aggregated statistics
+        """
+        profiler = None
+        
+        for index, result in results:
+            if verbose or (stats.games + 1) % 10 == 0:
+                print(f"  Game {stats.games + 1}/{num_games}...", end='\r')
+            
+            game_profiler = result.pop('profile', None)
+            if game_profiler is not None:
+                if profiler is None:
+                    profiler = PhaseProfiler()
+                profiler.merge(game_profiler)
+            
+            if self.sink is not None:
+                self.sink.write(run, index, result)
+            else:
+                self.results.append(result)
+            stats.add(result)
+        
+        if self.sink is not None:
+            self.sink.flush()
         print()  # New line after progress
         
-        # Calculate statistics
-        win_rate = (wins / num_games) * 100
-        avg_moves = total_moves / num_games
-        avg_safe_moves = total_safe_moves / num_games
-        avg_random_moves = total_random_moves / num_games
-        avg_revealed = total_revealed / num_games
-        avg_accuracy = (total_safe_moves / total_moves * 100) if total_moves > 0 else 0
-        
-        stats = {
-            'configuration': f"{height}x{width} with {mines} mines",
-            'games_played': num_games,
-            'wins': wins,
-            'losses': num_games - wins,
-            'win_rate': win_rate,
-            'avg_moves': avg_moves,
-            'avg_safe_moves': avg_safe_moves,
-            'avg_random_moves': avg_random_moves,
-            'avg_revealed_cells': avg_revealed,
-            'avg_accuracy': avg_accuracy
-        }
+        stats = stats.summary(f"{height}x{width} with {mines} mines")
+        if profiler is not None:
+            stats['profile'] = profiler.report()
         
         return stats
 
@@ -214,11 +448,37 @@ class MinesweeperTester:
         print(f"Average Random/Probabilistic:  {stats['avg_random_moves']:.2f}")
         print(f"Average Cells Revealed:        {stats['avg_revealed_cells']:.2f}")
         print(f"Safe Move Accuracy:            {stats['avg_accuracy']:.2f}%")
+        if 'profile' in stats:
+            self.print_profile(stats['profile'])
         print(f"{'='*70}\n")
 
-    def run_difficulty_comparison(self):
+    def print_profile(self, profile):
+        """
+        Print per-phase latencies from a profile report.
+        
+        Args:
+            profile: Report from PhaseProfiler.report
+        """
+        print(f"-" * 70)
+        print(f"{'Phase':<20} {'Calls':>10} {'p50 (ms)':>12} {'p95 (ms)':>12} {'p99 (ms)':>12}")
+        for phase, summary in profile['phases'].items():
+            print(f"{phase:<20} {summary['calls']:>10} {summary['p50'] * 1000:>12.3f} "
+                  f"{summary['p95'] * 1000:>12.3f} {summary['p99'] * 1000:>12.3f}")
+        for name, amount in profile['counters'].items():
+            print(f"{name + ':':<30} {amount}")
+        if profile['kb_size']:
+            kb_size = profile['kb_size']
+            print(f"{'KB size p50/p95/p99/max:':<30} {kb_size['p50']}/{kb_size['p95']}/"
+                  f"{kb_size['p99']}/{kb_size['max']}")
+
+    def run_difficulty_comparison(self, workers=1, seed=None, profile=False):
         """
         Compare AI performance across different difficulty levels.
+        
+        Args:
+            workers: Number of worker processes for each configuration
+            seed: Master seed for reproducible runs
+            profile: Report per-phase latencies for each configuration
         """
         print("\n" + "="*70)
         print("COMPREHENSIVE DIFFICULTY COMPARISON")
@@ -239,13 +499,19 @@ class MinesweeperTester:
         
         all_stats = []
         
+        # One seed per configuration, drawn in order from the master seed
+        master = random.Random(seed) if seed is not None else None
+        
         for config in configurations:
             print(f"\nTesting: {config['name']}")
             stats = self.run_multiple_games(
                 config['height'], 
                 config['width'], 
                 config['mines'], 
-                config['games']
+                config['games'],
+                workers=workers,
+                profile=profile,
+                seed=master.getrandbits(64) if master is not None else None
             )
             stats['name'] = config['name']
             all_stats.append(stats)
@@ -267,6 +533,9 @@ class MinesweeperTester:
         """
         Save all test results to a JSON file.
         
+        Only results kept in memory are saved; results streamed to a sink
+        are already on disk.
+        
         Args:
             filename: Output filename
         """